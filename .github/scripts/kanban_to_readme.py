@@ -1,135 +1,120 @@
 import os
 
 import requests
+from requests.adapters import HTTPAdapter
 
 GITHUB_TOKEN = os.environ["GH_TOKEN"]
+GRAPHQL_URL = "https://api.github.com/graphql"
 OWNER = "beesyst"
 PROJECT_NUMBER = 1
 README_PATH = "README.md"
+KANBAN_START = b"<!--KANBAN_START-->"
+KANBAN_END = b"<!--KANBAN_END-->"
 
 COLUMNS = [
     ("Todo", "Todo"),
     ("In Progress", "In Progress"),
     ("Done", "Done"),
 ]
+STATUS_TO_COL = {gh_name: col_name for col_name, gh_name in COLUMNS}
 
 QUERY = """
-query($login: String!, $number: Int!) {
+query($login: String!, $number: Int!, $cursor: String) {
   user(login: $login) {
     projectV2(number: $number) {
-      id
-      title
-      items(first: 100) {
+      items(first: 100, after: $cursor) {
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
         nodes {
           content {
             ... on Issue { title }
             ... on PullRequest { title }
             ... on DraftIssue { title }
           }
-          fieldValues(first: 20) {
-            nodes {
-              ... on ProjectV2ItemFieldSingleSelectValue {
-                name
-              }
-              ... on ProjectV2ItemFieldTextValue {
-                text
-              }
+          status: fieldValueByName(name: "Status") {
+            ... on ProjectV2ItemFieldSingleSelectValue {
+              name
             }
           }
         }
       }
-      fields(first: 20) {
-        nodes {
-          ... on ProjectV2FieldCommon {
-            name
-            id
-          }
-        }
-      }
     }
   }
 }
 """
 
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+SESSION.headers.update(
+    {"Authorization": f"bearer {GITHUB_TOKEN}", "Accept-Encoding": "gzip"}
+)
+
 
 def get_project_tasks():
-    url = "https://api.github.com/graphql"
-    headers = {"Authorization": f"bearer {GITHUB_TOKEN}"}
-    variables = {"login": OWNER, "number": PROJECT_NUMBER}
-    response = requests.post(
-        url, json={"query": QUERY, "variables": variables}, headers=headers
-    )
-    data = response.json()
-
-    if "errors" in data:
-        print("GraphQL Errors:", data["errors"])
-        raise Exception("GraphQL request failed")
-
-    project = data["data"]["user"]["projectV2"]
-    items = project["items"]["nodes"]
-
-    status_field = None
-    for field in project["fields"]["nodes"]:
-        if field["name"].lower() == "status":
-            status_field = field["id"]
-            break
+    variables = {"login": OWNER, "number": PROJECT_NUMBER, "cursor": None}
 
     tasks = {col[0]: [] for col in COLUMNS}
-    for item in items:
-        title = None
-        if item["content"]:
-            title = item["content"].get("title") or item["content"].get("text")
-        if not title:
-            continue
-        status = None
-        for field_value in item["fieldValues"]["nodes"]:
-            if "name" in field_value and field_value["name"] is not None:
-                status = field_value["name"]
-        for col_name, gh_name in COLUMNS:
-            if status == gh_name:
-                tasks[col_name].append(title)
-                break
+    while True:
+        response = SESSION.post(
+            GRAPHQL_URL, json={"query": QUERY, "variables": variables}, timeout=30
+        )
+        data = response.json()
+
+        if "errors" in data:
+            print("GraphQL Errors:", data["errors"])
+            raise Exception("GraphQL request failed")
+
+        items = data["data"]["user"]["projectV2"]["items"]
+        for item in items["nodes"]:
+            title = None
+            if item["content"]:
+                title = item["content"].get("title")
+            if not title:
+                continue
+            status = (item.get("status") or {}).get("name")
+            col = STATUS_TO_COL.get(status)
+            if col is not None:
+                tasks[col].append(title)
+
+        page_info = items["pageInfo"]
+        if not page_info["hasNextPage"]:
+            break
+        variables["cursor"] = page_info["endCursor"]
     return tasks
 
 
 def render_kanban_md(tasks):
-    counts = {col: len(tasks[col]) for col, _ in COLUMNS}
+    col_keys = [col for col, _ in COLUMNS]
     max_items = 10
 
-    headers = [f"{col} ({counts[col]})" for col, _ in COLUMNS]
-    md = "| " + " | ".join(headers) + " |\n"
-    md += "| " + " | ".join(["---"] * len(COLUMNS)) + " |\n"
-
+    headers = [f"{col} ({len(tasks[col])})" for col in col_keys]
+    lines_out = [
+        "| " + " | ".join(headers) + " |",
+        "| " + " | ".join(["---"] * len(col_keys)) + " |",
+    ]
     for i in range(max_items):
-        row = []
-        for col, _ in COLUMNS:
-            if i < len(tasks[col]):
-                row.append(tasks[col][i])
-            else:
-                row.append("&nbsp;")
-        md += "| " + " | ".join(row) + " |\n"
-    return md
+        row = (tasks[col][i] if i < len(tasks[col]) else "&nbsp;" for col in col_keys)
+        lines_out.append("| " + " | ".join(row) + " |")
+    return "\n".join(lines_out) + "\n"
 
 
 def update_readme(kanban_md):
-    with open(README_PATH, encoding="utf-8") as f:
-        lines = f.readlines()
-    start, end = None, None
-    for idx, line in enumerate(lines):
-        if "<!--KANBAN_START-->" in line:
-            start = idx
-        if "<!--KANBAN_END-->" in line:
-            end = idx
-    if start is not None and end is not None and end > start:
-        new_lines = lines[: start + 1] + [kanban_md + "\n"] + lines[end:]
+    with open(README_PATH, "rb") as f:
+        raw = f.read()
+    block = kanban_md.encode("utf-8") + b"\n"
+    start = raw.find(KANBAN_START)
+    end = raw.find(KANBAN_END)
+    # keep the marker lines themselves, replace everything between them
+    start_line_end = raw.find(b"\n", start) + 1 if start != -1 else 0
+    if start_line_end and end >= start_line_end:
+        end_line_start = raw.rfind(b"\n", 0, end) + 1
+        new_raw = raw[:start_line_end] + block + raw[end_line_start:]
     else:
-        new_lines = [
-            "<!--KANBAN_START-->\n",
-            kanban_md + "\n",
-            "<!--KANBAN_END-->\n",
-        ] + lines
-    with open(README_PATH, "w", encoding="utf-8") as f:
-        f.writelines(new_lines)
+        new_raw = KANBAN_START + b"\n" + block + KANBAN_END + b"\n" + raw
+    with open(README_PATH, "wb") as f:
+        f.write(new_raw)
 
 
 if __name__ == "__main__":
@@ -1,208 +1,314 @@
-import glob
+import hashlib
 import json
 import logging
 import os
+import shlex
+import shutil
 import subprocess
 import sys
 import tempfile
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, ROOT_DIR)
 
-from core.logger_container import clear_container_log_if_needed
-from core.logger_host import setup_host_logger
-
-CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
-import glob
-import json
-import logging
-import os
-import subprocess
-import sys
-import tempfile
-import threading
-import time
-from datetime import datetime
-
-ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, ROOT_DIR)
+for runtime_dir in ("logs", "reports", os.path.join("reports", "tmp")):
+    os.makedirs(os.path.join(ROOT_DIR, runtime_dir), exist_ok=True)
 
+from core.config import get_config
 from core.logger_container import clear_container_log_if_needed
 from core.logger_host import setup_host_logger
 
-CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
 LOGS_PATH = os.path.join(ROOT_DIR, "logs", "host.log")
+BASE_DIGEST_PATH = os.path.join(ROOT_DIR, "logs", ".base_digest")
+BASE_IMAGE_INPUTS = [
+    "docker/Dockerfile.base",
+    "docker/install_plugins.py",
+    "requirements.txt",
+    "config/config.json",
+]
 
-with open(CONFIG_PATH, "r") as config_file:
-    CONFIG = json.load(config_file)
+CONFIG = get_config()
 
 setup_host_logger(CONFIG)
 clear_container_log_if_needed(CONFIG)
 
 DB_CONTAINER = CONFIG["database"]["container_name"]
 NETWORK_NAME = CONFIG["docker_network"]
+DOCKER_BIN = shutil.which("docker")
+CHAIN_MARKER = "__honeyscan_step__"
+PG_USER = CONFIG["database"]["POSTGRES_USER"]
+PG_DB = CONFIG["database"]["POSTGRES_DB"]
+SCAN_CFG = CONFIG.get("scan_config", {})
+REPORT_FORMATS = SCAN_CFG.get("report_formats", ["html"])
+CLEAR_DB = SCAN_CFG.get("clear_db", False)
+OPEN_REPORT = SCAN_CFG.get("open_report", False)
 
 
-def spinner(
-    prefix: str, stop_event: threading.Event, success_event: threading.Event = None
-):
+class SpinnerManager:
+    """One long-lived thread that animates whichever stages are currently active.
+
+    A stage is only animated once it has been running for start_delay seconds,
+    so near-instant stages print just their result line.
+    """
+
     symbols = ["[+]", "[-]"]
-    i = 0
-    while not stop_event.is_set():
-        sys.stdout.write(f"\r{symbols[i % 2]} {prefix}")
-        sys.stdout.flush()
-        i += 1
-        time.sleep(0.18)
-    if success_event and success_event.is_set():
-        sys.stdout.write(f"\r[+] {prefix}\n")
-    else:
-        sys.stdout.write(f"\r[-] {prefix}\n")
-    sys.stdout.flush()
+    interval = 0.18
+    start_delay = 0.25
+
+    def __init__(self):
+        self._stages = {}
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        i = 0
+        with self._cond:
+            while True:
+                self._cond.wait_for(lambda: self._stages)
+                now = time.monotonic()
+                visible = [
+                    label
+                    for label, started in self._stages.items()
+                    if now - started >= self.start_delay
+                ]
+                if not visible:
+                    first_start = min(self._stages.values())
+                    self._cond.wait(first_start + self.start_delay - now)
+                    continue
+                sys.stdout.write(f"\r\033[K{self.symbols[i % 2]} {' | '.join(visible)}")
+                sys.stdout.flush()
+                i += 1
+                self._cond.wait(self.interval)
+
+    def set_stage(self, label: str):
+        with self._cond:
+            self._stages[label] = time.monotonic()
+            self._cond.notify_all()
+
+    def finish(self, label: str, ok: bool):
+        with self._cond:
+            if self._stages.pop(label, None) is None:
+                return
+            mark = "[+]" if ok else "[-]"
+            sys.stdout.write(f"\r\033[K{mark} {label}\n")
+            sys.stdout.flush()
+            self._cond.notify_all()
+
+    @contextmanager
+    def stage(self, label: str):
+        ok_event = threading.Event()
+        self.set_stage(label)
+        try:
+            yield ok_event
+        finally:
+            self.finish(label, ok_event.is_set())
+
+
+spinner_mgr = SpinnerManager()
 
 
-def run_command(command, cwd=None, hide_output=True):
-    logging.info(f"Running command: {command}")
+def run_command(command, cwd=None, hide_output=True, env=None):
+    logging.info(f"Running command: {' '.join(command)}")
     result = subprocess.run(
         command,
-        shell=True,
         cwd=cwd,
+        env=env,
         stdout=subprocess.DEVNULL if hide_output else None,
         stderr=subprocess.DEVNULL if hide_output else None,
     )
     if result.returncode != 0:
-        logging.error(f"Command failed: {command}")
+        logging.error(f"Command failed: {' '.join(command)}")
         return False
     return True
 
 
-def check_docker_installed():
-    stage = "Checking Docker"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
-    )
-    spinner_thread.start()
-    try:
-        subprocess.run(["docker", "--version"], check=True, stdout=subprocess.DEVNULL)
-        logging.info("Docker is installed.")
-        ok_event.set()
-    except subprocess.CalledProcessError:
-        logging.critical("Docker is not installed!")
-    finally:
-        stop_event.set()
-        spinner_thread.join()
-    if not ok_event.is_set():
-        sys.exit(1)
+@dataclass
+class DockerState:
+    daemon_ok: bool = False
+    has_base_image: bool = False
+    base_container_exists: bool = False
+    base_container_running: bool = False
+    db_container_running: bool = False
+    db_health: str = None
+    network_exists: bool = False
 
 
-def clean_docker_environment():
-    stage = f"Network {NETWORK_NAME}"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
+def probe_docker_state():
+    """Read daemon, image, container and network state with two docker calls."""
+    state = DockerState()
+    info = subprocess.run(
+        [DOCKER_BIN, "system", "info", "--format", "{{json .}}"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
     )
-    spinner_thread.start()
+    state.daemon_ok = info.returncode == 0
+    if not state.daemon_ok:
+        return state
+
+    # docker inspect resolves each name across object types and still prints
+    # the objects it found when some of them are missing (non-zero exit code).
     result = subprocess.run(
-        ["docker", "network", "ls", "-q", "--filter", f"name={NETWORK_NAME}"],
+        [
+            DOCKER_BIN,
+            "inspect",
+            "honeyscan-base",
+            "honeyscan_base",
+            DB_CONTAINER,
+            NETWORK_NAME,
+        ],
         stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
         text=True,
     )
     try:
-        if not result.stdout.strip():
+        objects = json.loads(result.stdout or "[]")
+    except json.JSONDecodeError:
+        objects = []
+
+    for obj in objects:
+        if "State" in obj:
+            name = obj.get("Name", "").lstrip("/")
+            running = bool(obj["State"].get("Running"))
+            if name == "honeyscan_base":
+                state.base_container_exists = True
+                state.base_container_running = running
+            elif name == DB_CONTAINER:
+                state.db_container_running = running
+                state.db_health = (obj["State"].get("Health") or {}).get("Status")
+        elif "RepoTags" in obj:
+            state.has_base_image = True
+        elif obj.get("Name") == NETWORK_NAME:
+            state.network_exists = True
+    logging.info(f"Docker state: {state}")
+    return state
+
+
+def check_docker_installed():
+    stage = "Checking Docker"
+    with spinner_mgr.stage(stage) as ok_event:
+        if DOCKER_BIN is None:
+            logging.critical("Docker is not installed!")
+        else:
+            state = probe_docker_state()
+            if state.daemon_ok:
+                logging.info(f"Docker found at {DOCKER_BIN}, daemon is reachable.")
+                ok_event.set()
+            else:
+                logging.critical("Docker daemon is not running!")
+    if not ok_event.is_set():
+        sys.exit(1)
+    return state
+
+
+def clean_docker_environment(state):
+    stage = f"Network {NETWORK_NAME}"
+    with spinner_mgr.stage(stage) as ok_event:
+        if not state.network_exists:
             logging.info(f"Network {NETWORK_NAME} not found. Creating...")
-            created = run_command(f"docker network create {NETWORK_NAME}")
+            created = run_command([DOCKER_BIN, "network", "create", NETWORK_NAME])
             if created:
                 logging.info(f"Docker network created: {NETWORK_NAME}")
+                state.network_exists = True
                 ok_event.set()
         else:
             logging.info(f"Network {NETWORK_NAME} already exists.")
             ok_event.set()
-    finally:
-        stop_event.set()
-        spinner_thread.join()
     if not ok_event.is_set():
         sys.exit(1)
 
 
-def wait_postgres_ready_from_logs(container_name, timeout=90):
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        log_result = subprocess.run(
-            ["docker", "logs", container_name],
+def wait_postgres_healthy(timeout=90):
+    """Block on docker health_status events until the DB container is healthy."""
+    proc = subprocess.Popen(
+        [
+            DOCKER_BIN,
+            "events",
+            "--filter",
+            f"container={DB_CONTAINER}",
+            "--filter",
+            "event=health_status",
+            "--format",
+            "{{.Status}}",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    timer = threading.Timer(timeout, proc.terminate)
+    timer.start()
+    try:
+        # the container may have turned healthy before the subscription started
+        current = subprocess.run(
+            [DOCKER_BIN, "inspect", "--format", "{{.State.Health.Status}}", DB_CONTAINER],
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
+            stderr=subprocess.DEVNULL,
             text=True,
         )
-        if "database system is ready to accept connections" in log_result.stdout:
+        if current.stdout.strip() == "healthy":
             return True
-        time.sleep(2)
-    return False
+        for line in proc.stdout:
+            if line.strip() == "health_status: healthy":
+                return True
+        return False
+    finally:
+        timer.cancel()
+        proc.terminate()
+        proc.wait()
 
 
-def start_postgres():
+def start_postgres(state):
     """Ensure PostgreSQL container is running. Starts it if necessary and waits for readiness."""
     stage = "PostgreSQL"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(target=spinner, args=(stage, stop_event, ok_event))
-    spinner_thread.start()
-
-    try:
-        result = subprocess.run(
-            ["docker", "ps", "-q", "--filter", f"name={DB_CONTAINER}"],
-            stdout=subprocess.PIPE,
-            text=True,
-        )
-        if result.stdout.strip():
+    with spinner_mgr.stage(stage) as ok_event:
+        if state.db_container_running and state.db_health != "starting":
             logging.info("PostgreSQL is already running.")
             ok_event.set()
             return
 
-        logging.info("Postgres container not found. Starting...")
-        run_command("docker compose -f db/compose.yaml up --build -d", cwd=ROOT_DIR, hide_output=True)
-
-        time.sleep(2)
-
-        ready = False
-        for i in range(10):  # 10 attempts at 1.5 sec each (max 15 sec)
-            result = subprocess.run(
-                [
-                    "docker",
-                    "exec",
-                    DB_CONTAINER,
-                    "pg_isready",
-                    "-U",
-                    CONFIG["database"]["POSTGRES_USER"],
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            if result.returncode == 0:
-                ready = True
-                break
-            time.sleep(1.5)
+        if state.db_container_running:
+            logging.info("PostgreSQL is starting. Waiting for healthy status...")
+            if wait_postgres_healthy(timeout=90):
+                logging.info("PostgreSQL is running and ready.")
+                ok_event.set()
+            return
 
-        if not ready:
-            logging.info("pg_isready did not respond — waiting for Postgres readiness in logs...")
-            ready = wait_postgres_ready_from_logs(DB_CONTAINER, timeout=90)
+        logging.info("Postgres container not found. Starting...")
+        ready = run_command(
+            [
+                DOCKER_BIN,
+                "compose",
+                "-f",
+                "db/compose.yaml",
+                "up",
+                "--build",
+                "-d",
+                "--wait",
+                "--wait-timeout",
+                "90",
+            ],
+            cwd=ROOT_DIR,
+            hide_output=True,
+        )
 
         if ready:
             try:
                 ver_result = subprocess.run(
                     [
-                        "docker",
+                        DOCKER_BIN,
                         "exec",
                         DB_CONTAINER,
                         "psql",
                         "-U",
-                        CONFIG["database"]["POSTGRES_USER"],
+                        PG_USER,
                         "-d",
-                        CONFIG["database"]["POSTGRES_DB"],
+                        PG_DB,
                         "-c",
                         "SELECT version();",
                     ],
@@ -221,86 +327,88 @@ def start_postgres():
             except Exception:
                 logging.info("PostgreSQL is running and ready.")
             ok_event.set()
-    finally:
-        stop_event.set()
-        spinner_thread.join()
 
     if not ok_event.is_set():
         try:
-            log_result = subprocess.run(
-                ["docker", "logs", DB_CONTAINER],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-            )
-            with open(os.path.join(ROOT_DIR, "logs", "postgres_last.log"), "w") as f:
-                f.write(log_result.stdout)
+            with open(os.path.join(ROOT_DIR, "logs", "postgres_last.log"), "wb") as f:
+                subprocess.run(
+                    [DOCKER_BIN, "logs", DB_CONTAINER],
+                    stdout=f,
+                    stderr=subprocess.STDOUT,
+                )
         except Exception as e:
             logging.error(f"Failed to get postgres logs: {e}")
         logging.critical("PostgreSQL did not start in time!")
         sys.exit(1)
 
 
-def ensure_honeyscan_base_image():
+def compute_base_image_digest():
+    h = hashlib.blake2b()
+    for rel_path in BASE_IMAGE_INPUTS:
+        h.update(rel_path.encode())
+        try:
+            with open(os.path.join(ROOT_DIR, rel_path), "rb") as f:
+                h.update(f.read())
+        except OSError:
+            continue
+    return h.hexdigest()
+
+
+def ensure_honeyscan_base_image(state):
     stage = "honeyscan-base image"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
-    )
-    spinner_thread.start()
-    try:
-        result = subprocess.run(
-            ["docker", "images", "-q", "honeyscan-base"],
-            stdout=subprocess.PIPE,
-            text=True,
-        )
-        if not result.stdout.strip():
-            logging.info("honeyscan-base image not found. Building...")
+    with spinner_mgr.stage(stage) as ok_event:
+        digest = compute_base_image_digest()
+        saved_digest = None
+        if os.path.exists(BASE_DIGEST_PATH):
+            with open(BASE_DIGEST_PATH, "r") as f:
+                saved_digest = f.read().strip()
+
+        if state.has_base_image and digest == saved_digest:
+            logging.info("honeyscan-base image found and up to date.")
+            ok_event.set()
+        else:
+            if state.has_base_image:
+                logging.info("honeyscan-base build inputs changed. Rebuilding...")
+            else:
+                logging.info("honeyscan-base image not found. Building...")
             success = run_command(
-                "docker build -t honeyscan-base -f docker/Dockerfile.base .", cwd=ROOT_DIR
+                [
+                    DOCKER_BIN,
+                    "build",
+                    "-t",
+                    "honeyscan-base",
+                    "-f",
+                    "docker/Dockerfile.base",
+                    ".",
+                ],
+                cwd=ROOT_DIR,
+                env={**os.environ, "DOCKER_BUILDKIT": "1"},
             )
             if success:
                 logging.info("honeyscan-base build completed successfully.")
+                with open(BASE_DIGEST_PATH, "w") as f:
+                    f.write(digest)
+                if state.has_base_image:
+                    # the running container still uses the previous image
+                    state.base_container_running = False
+                state.has_base_image = True
                 ok_event.set()
-        else:
-            logging.info("honeyscan-base image found.")
-            ok_event.set()
-    finally:
-        stop_event.set()
-        spinner_thread.join()
     if not ok_event.is_set():
         logging.critical("honeyscan-base build failed.")
         sys.exit(1)
 
 
-def start_honeyscan_container():
+def start_honeyscan_container(state):
     stage = "honeyscan_base container"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
-    )
-    spinner_thread.start()
-    try:
-        result = subprocess.run(
-            ["docker", "ps", "-q", "--filter", "name=honeyscan_base"],
-            stdout=subprocess.PIPE,
-            text=True,
-        )
-        if result.stdout.strip():
+    with spinner_mgr.stage(stage) as ok_event:
+        if state.base_container_running:
             logging.info("honeyscan_base container already running.")
             ok_event.set()
             return
 
-        result_all = subprocess.run(
-            ["docker", "ps", "-aq", "--filter", "name=honeyscan_base"],
-            stdout=subprocess.PIPE,
-            text=True,
-        )
-        if result_all.stdout.strip():
+        if state.base_container_exists:
             logging.info("Removing stopped honeyscan_base container.")
-            subprocess.run(["docker", "rm", "-f", "honeyscan_base"])
+            subprocess.run([DOCKER_BIN, "rm", "-f", "honeyscan_base"])
 
         logging.info("Starting honeyscan_base container...")
         volumes = [
@@ -324,17 +432,17 @@ def start_honeyscan_container():
             "/etc/localtime:/etc/localtime:ro",
         ]
         success = run_command(
-            f"docker run -d --name honeyscan_base --network {NETWORK_NAME} "
-            + " ".join(volumes)
-            + " honeyscan-base tail -f /dev/null",
+            [DOCKER_BIN, "run", "-d", "--name", "honeyscan_base"]
+            + ["--network", NETWORK_NAME]
+            + volumes
+            + ["honeyscan-base", "tail", "-f", "/dev/null"],
             cwd=ROOT_DIR,
         )
         if success:
             logging.info("honeyscan_base container started successfully.")
+            state.base_container_exists = True
+            state.base_container_running = True
             ok_event.set()
-    finally:
-        stop_event.set()
-        spinner_thread.join()
     if not ok_event.is_set():
         logging.critical("Failed to start honeyscan_base container.")
         sys.exit(1)
@@ -342,24 +450,22 @@ def start_honeyscan_container():
 
 def purge_database():
     stage = "Database purge"
-    if CONFIG.get("scan_config", {}).get("clear_db", False):
-        stop_event = threading.Event()
-        ok_event = threading.Event()
-        spinner_thread = threading.Thread(
-            target=spinner, args=(stage, stop_event, ok_event)
-        )
-        spinner_thread.start()
-        try:
+    if CLEAR_DB:
+        with spinner_mgr.stage(stage) as ok_event:
             success = run_command(
-                "docker exec honeyscan_base python3 /core/collector.py --purge-only",
+                [
+                    DOCKER_BIN,
+                    "exec",
+                    "honeyscan_base",
+                    "python3",
+                    "/core/collector.py",
+                    "--purge-only",
+                ],
                 hide_output=True,
             )
             if success:
                 logging.info("Database purge before scanning")
                 ok_event.set()
-        finally:
-            stop_event.set()
-            spinner_thread.join()
         if not ok_event.is_set():
             logging.critical("Database purge failed.")
             sys.exit(1)
@@ -369,165 +475,189 @@ def purge_database():
 
 def cleanup_all_tmp_files():
     stage = "Removing temporary files"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
-    )
-    spinner_thread.start()
-    try:
+    with spinner_mgr.stage(stage) as ok_event:
         tmp_dir = tempfile.gettempdir()
-        tmp_patterns = [f"{tmp_dir}/*_ip.xml", f"{tmp_dir}/*_domain_*.xml"]
         files_deleted = 0
-        for pattern in tmp_patterns:
-            for f in glob.glob(pattern):
+        with os.scandir(tmp_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(".xml"):
+                    continue
+                if not (name.endswith("_ip.xml") or "_domain_" in name):
+                    continue
                 try:
-                    os.remove(f)
-                    logging.info(f"Removed temporary file: {f}")
+                    os.remove(entry.path)
+                    logging.info(f"Removed temporary file: {entry.path}")
                     files_deleted += 1
                 except Exception as e:
-                    logging.warning(f"Failed to remove {f}: {e}")
+                    logging.warning(f"Failed to remove {entry.path}: {e}")
 
         reports_tmp = os.path.join(ROOT_DIR, "reports", "tmp")
-        if os.path.isdir(reports_tmp):
-            for filename in os.listdir(reports_tmp):
-                file_path = os.path.join(reports_tmp, filename)
+        with os.scandir(reports_tmp) as entries:
+            for entry in entries:
                 try:
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                        logging.info(f"Removed file from reports/tmp: {file_path}")
+                    if entry.is_file(follow_symlinks=False):
+                        os.remove(entry.path)
+                        logging.info(f"Removed file from reports/tmp: {entry.path}")
                         files_deleted += 1
                 except Exception as e:
-                    logging.warning(f"Failed to remove {file_path}: {e}")
-        else:
-            os.makedirs(reports_tmp, exist_ok=True)
+                    logging.warning(f"Failed to remove {entry.path}: {e}")
 
         if files_deleted >= 0:
             ok_event.set()
-    finally:
-        stop_event.set()
-        spinner_thread.join()
 
 
-def run_plugins(temp_files_path):
-    stage = "Running plugins"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
+def docker_exec_chain(cmds, stop_on_error=True):
+    """Run several commands in honeyscan_base through a single docker exec.
+
+    Yields (index, ok) for every command as soon as it finishes.
+    """
+    parts = []
+    for i, cmd in enumerate(cmds):
+        parts.append(f"{shlex.join(cmd)}; rc=$?; echo {CHAIN_MARKER}{i}:$rc")
+        if stop_on_error:
+            parts.append('[ "$rc" -eq 0 ] || exit "$rc"')
+    proc = subprocess.Popen(
+        [DOCKER_BIN, "exec", "honeyscan_base", "sh", "-c", "; ".join(parts)],
+        stdout=subprocess.PIPE,
+        text=True,
     )
-    spinner_thread.start()
     try:
-        cmd = f"docker exec honeyscan_base python3 /core/plugin_runner.py --output {temp_files_path}"
-        result = subprocess.run(cmd, shell=True)
-        if result.returncode == 0:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(CHAIN_MARKER):
+                index, rc = line[len(CHAIN_MARKER) :].split(":")
+                yield int(index), rc == "0"
+            elif line:
+                logging.info(f"[honeyscan_base] {line}")
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def run_plugins_and_collector(temp_files_path):
+    steps = docker_exec_chain(
+        [
+            ["python3", "/core/plugin_runner.py", "--output", temp_files_path],
+            ["python3", "/core/collector.py", "--temp-file", temp_files_path],
+        ]
+    )
+
+    stage = "Running plugins"
+    with spinner_mgr.stage(stage) as ok_event:
+        _, ok = next(steps, (None, False))
+        if ok:
             logging.info(f"Plugins completed, output: {temp_files_path}")
             ok_event.set()
-    finally:
-        stop_event.set()
-        spinner_thread.join()
     if not ok_event.is_set():
         logging.error("Plugin execution error.")
         sys.exit(1)
 
-
-def run_collector(temp_files_path):
     stage = "Collecting results into database"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
-    )
-    spinner_thread.start()
-    try:
-        cmd = f"docker exec honeyscan_base python3 /core/collector.py --temp-file {temp_files_path}"
-        result = subprocess.run(cmd, shell=True)
-        if result.returncode == 0:
+    with spinner_mgr.stage(stage) as ok_event:
+        _, ok = next(steps, (None, False))
+        if ok:
             ok_event.set()
             logging.info("Collector results collection completed.")
-    finally:
-        stop_event.set()
-        spinner_thread.join()
     if not ok_event.is_set():
         logging.error("collector.py execution error.")
 
 
+def report_command(fmt, timestamp, clear_reports):
+    cmd = [
+        "python3",
+        "/core/report_generator.py",
+        "--format",
+        fmt,
+        "--timestamp",
+        timestamp,
+    ]
+    if clear_reports:
+        cmd.append("--clear-reports")
+    return cmd
+
+
+def open_html_report(html_report_path):
+    try:
+        if sys.platform.startswith("linux"):
+            subprocess.Popen(
+                ["xdg-open", html_report_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        elif sys.platform == "darwin":
+            subprocess.Popen(
+                ["open", html_report_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        elif sys.platform == "win32":
+            os.startfile(html_report_path)
+        logging.info(f"Opening HTML report: {html_report_path}")
+    except Exception as e:
+        logging.warning(f"Failed to open HTML report: {e}")
+
+
 def generate_reports(timestamp):
-    formats = CONFIG.get("scan_config", {}).get("report_formats", ["html"])
-    open_report = CONFIG.get("scan_config", {}).get("open_report", False)
     html_report_name = f"report_{timestamp}.html"
     html_report_path = os.path.join(ROOT_DIR, "reports", html_report_name)
 
-    for i, fmt in enumerate(formats):
-        stage = f"Generating {fmt.upper()} report"
-        stop_event = threading.Event()
-        ok_event = threading.Event()
-        spinner_thread = threading.Thread(
-            target=spinner, args=(stage, stop_event, ok_event)
-        )
-        spinner_thread.start()
-        try:
-            if fmt not in ["html", "pdf", "txt", "terminal"]:
-                logging.warning(f"Unsupported report format: {fmt}")
-                continue
+    formats = []
+    for fmt in REPORT_FORMATS:
+        if fmt in ["html", "pdf", "txt", "terminal"]:
+            formats.append(fmt)
+            continue
+        with spinner_mgr.stage(f"Generating {fmt.upper()} report"):
+            logging.warning(f"Unsupported report format: {fmt}")
+
+    # The first report run clears the reports folder.
+    clear_reports = True
+    if "terminal" in formats:
+        stage = "Generating TERMINAL report"
+        with spinner_mgr.stage(stage) as ok_event:
+            ok_event.set()
+            spinner_mgr.finish(stage, True)
+            run_command(
+                [DOCKER_BIN, "exec", "honeyscan_base"]
+                + report_command("terminal", timestamp, clear_reports),
+                hide_output=False,
+            )
+        clear_reports = False
 
-            clear_flag = "--clear-reports" if i == 0 else ""
-            if fmt == "terminal":
-                ok_event.set()
-                stop_event.set()
-                spinner_thread.join()
-                run_command(
-                    f"docker exec honeyscan_base python3 /core/report_generator.py --format {fmt} --timestamp {timestamp} {clear_flag}",
-                    hide_output=False,
-                )
-                ok_event.set()
-            else:
-                success = run_command(
-                    f"docker exec honeyscan_base python3 /core/report_generator.py --format {fmt} --timestamp {timestamp} {clear_flag}",
-                    hide_output=True,
-                )
-                if success:
-                    ok_event.set()
-                    logging.info(f"Report {fmt.upper()} generated successfully.")
-        finally:
-            stop_event.set()
-            spinner_thread.join()
+    file_formats = [fmt for fmt in formats if fmt != "terminal"]
+    if not file_formats:
+        return
+    stage = f"Generating {', '.join(fmt.upper() for fmt in file_formats)} report"
+    with spinner_mgr.stage(stage) as ok_event:
+        success = run_command(
+            [DOCKER_BIN, "exec", "honeyscan_base"]
+            + report_command(",".join(file_formats), timestamp, clear_reports),
+            hide_output=True,
+        )
+        if success:
+            ok_event.set()
+            logging.info(f"Reports {', '.join(file_formats)} generated successfully.")
 
-        if open_report and fmt == "html" and os.path.exists(html_report_path):
-            try:
-                if sys.platform.startswith("linux"):
-                    subprocess.Popen(
-                        ["xdg-open", html_report_path],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                    )
-                elif sys.platform == "darwin":
-                    subprocess.Popen(
-                        ["open", html_report_path],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                    )
-                elif sys.platform == "win32":
-                    os.startfile(html_report_path)
-                logging.info(f"Opening HTML report: {html_report_path}")
-            except Exception as e:
-                logging.warning(f"Failed to open HTML report: {e}")
+    if OPEN_REPORT and "html" in file_formats and os.path.exists(html_report_path):
+        open_html_report(html_report_path)
 
 
 def post_scan_chown():
     stage = "Updating /reports permissions"
-    stop_event = threading.Event()
-    ok_event = threading.Event()
-    spinner_thread = threading.Thread(
-        target=spinner, args=(stage, stop_event, ok_event)
-    )
-    spinner_thread.start()
-    try:
+    with spinner_mgr.stage(stage) as ok_event:
         try:
             user_id = os.getuid()
             group_id = os.getgid()
             success = run_command(
-                f"docker exec honeyscan_base chown -R {user_id}:{group_id} /reports",
+                [
+                    DOCKER_BIN,
+                    "exec",
+                    "honeyscan_base",
+                    "chown",
+                    "-R",
+                    f"{user_id}:{group_id}",
+                    "/reports",
+                ],
                 hide_output=True,
             )
             if success:
@@ -537,27 +667,27 @@ def post_scan_chown():
                 )
         except Exception as e:
             logging.warning(f"Failed to change owner of reports: {e}")
-    finally:
-        stop_event.set()
-        spinner_thread.join()
 
 
 def main():
     print("[+] Starting honeyscan...")
     logging.info("==== START ====")
-    check_docker_installed()
-    clean_docker_environment()
-    start_postgres()
-    ensure_honeyscan_base_image()
-    start_honeyscan_container()
+    docker_state = check_docker_installed()
+    clean_docker_environment(docker_state)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        f_pg = executor.submit(start_postgres, docker_state)
+        f_img = executor.submit(ensure_honeyscan_base_image, docker_state)
+        f_tmp = executor.submit(cleanup_all_tmp_files)
+        f_pg.result()
+        f_img.result()
+        f_tmp.result()
+    start_honeyscan_container(docker_state)
     purge_database()
-    cleanup_all_tmp_files()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     temp_files_path = os.path.join(
         tempfile.gettempdir(), f"temp_files_{timestamp}.json"
     )
-    run_plugins(temp_files_path)
-    run_collector(temp_files_path)
+    run_plugins_and_collector(temp_files_path)
     generate_reports(timestamp)
     post_scan_chown()
     print("[+] honeyscan finished!")
@@ -1,31 +1,71 @@
 import importlib.util
+import io
 import json
 import logging
 import os
 import sys
-from datetime import datetime
 
 sys.path.insert(0, "/")
 
 import psycopg2
+from psycopg2.extras import execute_values
+from core.config import get_config, load_json
 from core.logger_container import setup_container_logger
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
 PLUGINS_DIR = os.path.join(ROOT_DIR, "plugins")
 
+try:
+    import orjson
+
+    def _json_dumps(value):
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+except ImportError:
+
+    def _json_dumps(value):
+        return json.dumps(value, ensure_ascii=False)
+
+
 setup_container_logger()
 
-with open(CONFIG_PATH) as config_file:
-    CONFIG = json.load(config_file)
+CONFIG = get_config()
 
 DB_CONFIG = CONFIG["database"]
 PLUGINS = CONFIG.get("plugins", [])
+PLUGIN_CATEGORIES = {p["name"]: p.get("category", "General Info") for p in PLUGINS}
+PLUGIN_MODULES = {}
+
+VULN_COLUMNS = (
+    "id",
+    "service_id",
+    "host_id",
+    "plugin",
+    "source",
+    "category",
+    "severity",
+    "title",
+    "description",
+    "refs",
+    "meta",
+)
+EVIDENCE_COLUMNS = ("vuln_id", "plugin", "log_type", "log_path", "raw_log")
+EMPTY_META = "{}"
+
+
+def dump_meta(meta):
+    return _json_dumps(meta) if meta else EMPTY_META
+
+
+DB_CONN = None
 
 
 def connect_to_db():
+    global DB_CONN
+    if DB_CONN is not None and not DB_CONN.closed:
+        return DB_CONN
     try:
-        conn = psycopg2.connect(
+        DB_CONN = psycopg2.connect(
             database=DB_CONFIG["POSTGRES_DB"],
             user=DB_CONFIG["POSTGRES_USER"],
             password=DB_CONFIG["POSTGRES_PASSWORD"],
@@ -33,26 +73,85 @@ def connect_to_db():
             port=DB_CONFIG["POSTGRES_PORT"],
         )
         logging.info("Successful connection to the database.")
-        return conn
+        return DB_CONN
     except psycopg2.Error as e:
         logging.critical(f"Database connection error: {e}")
         exit(1)
 
 
+# Older databases got a new hosts row per run. Fold duplicate (ip, fqdn)
+# hosts into the lowest id, merging services that then collide on their
+# unique key, so the index below can be created without losing history.
+DEDUPE_HOSTS_SQL = """
+CREATE TEMP TABLE host_map ON COMMIT DROP AS
+SELECT id, keep_id FROM (
+    SELECT id, min(id) OVER (PARTITION BY ip, fqdn) AS keep_id FROM hosts
+) h
+WHERE id <> keep_id;
+
+CREATE TEMP TABLE service_map ON COMMIT DROP AS
+SELECT id, keep_id FROM (
+    SELECT s.id,
+           CASE WHEN s.port IS NULL OR s.protocol IS NULL
+                     OR s.service_name IS NULL OR s.plugin IS NULL
+                THEN s.id
+                ELSE min(s.id) OVER (
+                    PARTITION BY coalesce(m.keep_id, s.host_id),
+                                 s.port, s.protocol, s.service_name, s.plugin
+                )
+           END AS keep_id
+    FROM services s
+    LEFT JOIN host_map m ON m.id = s.host_id
+) s
+WHERE id <> keep_id;
+
+UPDATE vuln v SET service_id = m.keep_id FROM service_map m WHERE v.service_id = m.id;
+UPDATE registry r SET service_id = m.keep_id FROM service_map m WHERE r.service_id = m.id;
+DELETE FROM services s USING service_map m WHERE s.id = m.id;
+
+UPDATE services s SET host_id = m.keep_id FROM host_map m WHERE s.host_id = m.id;
+UPDATE vuln v SET host_id = m.keep_id FROM host_map m WHERE v.host_id = m.id;
+UPDATE registry r SET host_id = m.keep_id FROM host_map m WHERE r.host_id = m.id;
+DELETE FROM hosts h USING host_map m WHERE h.id = m.id;
+
+DROP TABLE host_map, service_map;
+"""
+
+
+def ensure_hosts_index(cursor):
+    """Create the (ip, fqdn) index behind insert_hosts' ON CONFLICT if missing.
+
+    init.sql only runs when the Postgres volume is first created, so older
+    databases do not have it and may hold duplicate hosts; those are merged
+    first. Database errors propagate to the caller.
+    """
+    cursor.execute("SELECT to_regclass('idx_hosts_ip_fqdn')")
+    if cursor.fetchone()[0] is not None:
+        return
+    cursor.execute(DEDUPE_HOSTS_SQL)
+    cursor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_hosts_ip_fqdn "
+        "ON hosts (ip, fqdn) NULLS NOT DISTINCT;"
+    )
+    logging.info("Created idx_hosts_ip_fqdn on hosts (ip, fqdn).")
+
+
 def purge_tables(cursor):
     try:
-        cursor.execute("TRUNCATE evidence RESTART IDENTITY CASCADE;")
-        cursor.execute("TRUNCATE vuln RESTART IDENTITY CASCADE;")
-        cursor.execute("TRUNCATE services RESTART IDENTITY CASCADE;")
-        cursor.execute("TRUNCATE hosts RESTART IDENTITY CASCADE;")
-        cursor.execute("TRUNCATE registry RESTART IDENTITY CASCADE;")
+        cursor.execute(
+            "TRUNCATE evidence, vuln, services, hosts, registry RESTART IDENTITY CASCADE;"
+        )
         logging.info("All main tables truncated successfully.")
     except psycopg2.Error as e:
         logging.critical(f"Error truncating tables: {e}")
         exit(1)
+    ensure_hosts_index(cursor)
 
 
 def load_plugin_parser(plugin_name):
+    if plugin_name in PLUGIN_MODULES:
+        return PLUGIN_MODULES[plugin_name]
+
     plugin_path = os.path.join(PLUGINS_DIR, f"{plugin_name}.py")
     if not os.path.exists(plugin_path):
         logging.error(f"Parser file {plugin_path} not found.")
@@ -62,118 +161,179 @@ def load_plugin_parser(plugin_name):
         spec = importlib.util.spec_from_file_location(plugin_name, plugin_path)
         plugin = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(plugin)
+        PLUGIN_MODULES[plugin_name] = plugin
         return plugin
     except Exception as e:
         logging.error(f"Error loading parser {plugin_name}: {e}")
         return None
 
 
+EMPTY_VALUES = frozenset(("-", "", "None", "null", "0"))
+
+
 def is_meaningful_entry(entry, important_fields):
-    return not all(
-        str(entry.get(k, "-")).strip() in ["-", "", "None", "null", "0"]
-        for k in important_fields
+    for k in important_fields:
+        value = entry.get(k)
+        if value is None:
+            continue
+        if type(value) is not str:
+            value = str(value)
+        if value.strip() not in EMPTY_VALUES:
+            return True
+    return False
+
+
+def insert_hosts(cursor, host_rows):
+    """Insert hosts in one statement and return a {(ip, fqdn): host_id} map."""
+    if not host_rows:
+        return {}
+    # DO NOTHING would skip RETURNING for existing rows, so touch the key instead.
+    rows = execute_values(
+        cursor,
+        """
+        INSERT INTO hosts (ip, fqdn, os, meta) VALUES %s
+        ON CONFLICT (ip, fqdn) DO UPDATE SET ip = EXCLUDED.ip
+        RETURNING id, ip, fqdn
+        """,
+        [
+            (ip, fqdn, os_name, dump_meta(meta))
+            for (ip, fqdn), (os_name, meta) in host_rows.items()
+        ],
+        page_size=1000,
+        fetch=True,
     )
+    return {(ip, fqdn): host_id for host_id, ip, fqdn in rows}
 
 
-def get_or_create_host(cursor, ip=None, fqdn=None, os_name=None, meta=None):
-    cursor.execute("SELECT id FROM hosts WHERE ip = %s AND fqdn = %s", (ip, fqdn))
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-    cursor.execute(
-        "INSERT INTO hosts (ip, fqdn, os, meta, created_at) VALUES (%s, %s, %s, %s, %s) RETURNING id",
-        (ip, fqdn, os_name, json.dumps(meta or {}, ensure_ascii=False), datetime.now()),
-    )
-    return cursor.fetchone()[0]
-
-
-def get_or_create_service(
-    cursor,
-    host_id,
-    port,
-    protocol,
-    service_name,
-    product=None,
-    version=None,
-    banner=None,
-    plugin=None,
-    meta=None,
-):
-    cursor.execute(
-        "SELECT id FROM services WHERE host_id = %s AND port = %s AND protocol = %s AND service_name = %s AND plugin = %s",
-        (host_id, port, protocol, service_name, plugin),
-    )
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-    cursor.execute(
-        "INSERT INTO services (host_id, port, protocol, service_name, product, version, banner, plugin, meta, created_at) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id",
-        (
-            host_id,
-            port,
-            protocol,
-            service_name,
-            product,
-            version,
-            banner,
-            plugin,
-            json.dumps(meta or {}, ensure_ascii=False),
-            datetime.now(),
-        ),
-    )
-    return cursor.fetchone()[0]
-
-
-def create_vuln(
-    cursor,
-    service_id,
-    host_id,
-    plugin,
-    source,
-    category,
-    severity,
-    title,
-    description,
-    refs,
-    meta=None,
-):
-    cursor.execute(
+def insert_services(cursor, service_rows):
+    """Insert services in one statement and return a {service_key: service_id} map."""
+    if not service_rows:
+        return {}
+    rows = execute_values(
+        cursor,
         """
-        INSERT INTO vuln (service_id, host_id, plugin, source, category, severity, title, description, refs, created_at, meta)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        RETURNING id
+        INSERT INTO services (host_id, port, protocol, service_name, product, version, banner, plugin, meta)
+        VALUES %s
+        ON CONFLICT (host_id, port, protocol, service_name, plugin) DO UPDATE SET host_id = EXCLUDED.host_id
+        RETURNING id, host_id, port, protocol, service_name, plugin
         """,
-        (
-            service_id,
-            host_id,
-            plugin,
-            source,
-            category,
-            severity,
-            title,
-            description,
-            refs,
-            datetime.now(),
-            json.dumps(meta or {}, ensure_ascii=False),
-        ),
+        [
+            key[:4] + (product, version, banner, key[4], dump_meta(meta))
+            for key, (product, version, banner, meta) in service_rows.items()
+        ],
+        page_size=1000,
+        fetch=True,
     )
-    return cursor.fetchone()[0]
+    return {tuple(row[1:]): row[0] for row in rows}
 
 
-def create_evidence(cursor, vuln_id, plugin, log_type, log_path, raw_log):
+def reserve_ids(cursor, table, count):
     cursor.execute(
-        """
-        INSERT INTO evidence (vuln_id, plugin, log_type, log_path, raw_log, created_at)
-        VALUES (%s,%s,%s,%s,%s,%s)
-        RETURNING id
-        """,
-        (vuln_id, plugin, log_type, log_path, raw_log, datetime.now()),
+        "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+        (table, count),
     )
-    return cursor.fetchone()[0]
+    return [row[0] for row in cursor.fetchall()]
+
+
+def copy_array(values):
+    if values is None:
+        return None
+    items = []
+    for v in values:
+        if v is None:
+            items.append("NULL")
+        else:
+            v = str(v).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{v}"')
+    return "{" + ",".join(items) + "}"
+
+
+def copy_value(value):
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream rows into table with COPY FROM STDIN (text format)."""
+    if not rows:
+        return
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(copy_value(v) for v in row) + "\n")
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
+
+def insert_vulns(cursor, vuln_rows):
+    """Insert vulns with pre-reserved ids so evidence rows can reference them."""
+    if not vuln_rows:
+        return []
+    vuln_ids = reserve_ids(cursor, "vuln", len(vuln_rows))
+    copy_rows(
+        cursor,
+        "vuln",
+        VULN_COLUMNS,
+        [
+            (vuln_id,)
+            + row[:8]
+            + (copy_array(row[8]), dump_meta(row[9]))
+            for vuln_id, row in zip(vuln_ids, vuln_rows)
+        ],
+    )
+    return vuln_ids
+
+
+def parse_plugin_results(plugin_name, files):
+    plugin_parser = load_plugin_parser(plugin_name)
+    if not plugin_parser:
+        logging.error(f"Parser for plugin {plugin_name} not loaded. Skipping.")
+        return []
+    if not hasattr(plugin_parser, "parse"):
+        logging.error(f"Plugin {plugin_name} does not contain parse(). Skipping.")
+        return []
+
+    important_fields = []
+    if hasattr(plugin_parser, "get_important_fields"):
+        important_fields = plugin_parser.get_important_fields()
+
+    try:
+        results = []
+        if hasattr(plugin_parser, "merge_entries") and len(files) > 1:
+            parsed_lists = []
+            for f in files:
+                label = f.get("source", "unknown")
+                parsed = plugin_parser.parse(f["path"], source_label=label)
+                parsed_lists.append(parsed)
+            merged_data = plugin_parser.merge_entries(*parsed_lists)
+            results = [
+                d
+                for d in merged_data
+                if not important_fields or is_meaningful_entry(d, important_fields)
+            ]
+        else:
+            for f in files:
+                parsed = plugin_parser.parse(
+                    f["path"], f.get("source", "unknown"), f.get("port", "-")
+                )
+                for entry in parsed:
+                    if not important_fields or is_meaningful_entry(
+                        entry, important_fields
+                    ):
+                        results.append(entry)
+    except Exception as e:
+        logging.error(f"Error running parse() for {plugin_name}: {e}")
+        return []
+    return results
 
 
 def process_temp_files(cursor, temp_files):
-    total_added = 0
     grouped_files = {}
 
     ip_target = CONFIG.get("scan_config", {}).get("target_ip", "unknown")
@@ -186,151 +346,126 @@ def process_temp_files(cursor, temp_files):
             continue
         grouped_files.setdefault(plugin_name, []).append(temp_file_info)
 
+    # Pass 1: parse everything and prepare rows without touching the database.
+    records = []
+    host_rows = {}
+    service_rows = {}
     for plugin_name, files in grouped_files.items():
-        plugin_parser = load_plugin_parser(plugin_name)
-        if not plugin_parser:
-            logging.error(f"Parser for plugin {plugin_name} not loaded. Skipping.")
-            continue
-        if not hasattr(plugin_parser, "parse"):
-            logging.error(
-                f"Plugin {plugin_name} does not contain parse(). Skipping."
-            )
-            continue
-
-        important_fields = []
-        if hasattr(plugin_parser, "get_important_fields"):
-            important_fields = plugin_parser.get_important_fields()
-
-        try:
-            results = []
-            if hasattr(plugin_parser, "merge_entries") and len(files) > 1:
-                parsed_lists = []
-                for f in files:
-                    label = f.get("source", "unknown")
-                    parsed = plugin_parser.parse(f["path"], source_label=label)
-                    parsed_lists.append(parsed)
-                merged_data = plugin_parser.merge_entries(*parsed_lists)
-                results = [
-                    d
-                    for d in merged_data
-                    if not important_fields or is_meaningful_entry(d, important_fields)
-                ]
-            else:
-                for f in files:
-                    parsed = plugin_parser.parse(
-                        f["path"], f.get("source", "unknown"), f.get("port", "-")
-                    )
-                    for entry in parsed:
-                        if not important_fields or is_meaningful_entry(
-                            entry, important_fields
-                        ):
-                            results.append(entry)
-        except Exception as e:
-            logging.error(f"Error running parse() for {plugin_name}: {e}")
-            continue
-
+        results = parse_plugin_results(plugin_name, files)
         if not results:
             logging.info(f"No data to insert from {plugin_name}.")
             continue
 
+        category = PLUGIN_CATEGORIES.get(plugin_name, "General Info")
+        plugin_added = 0
         for item in results:
             try:
-                ip = item.get("ip") or (
-                    ip_target if item.get("target_type") == "ip" else None
-                )
-                fqdn = item.get("fqdn") or (
-                    domain_target if item.get("target_type") == "domain" else None
+                get = item.get
+                target_type = get("target_type")
+                ip = get("ip") or (ip_target if target_type == "ip" else None)
+                fqdn = get("fqdn") or (
+                    domain_target if target_type == "domain" else None
                 )
-                os_name = item.get("os")
-                host_meta = item.get("host_meta", {})
-                host_id = get_or_create_host(cursor, ip, fqdn, os_name, host_meta)
-
-                port = (
-                    int(item.get("port", 0))
-                    if "port" in item and str(item["port"]).isdigit()
-                    else None
+                host_key = (ip, fqdn)
+                host_rows.setdefault(
+                    host_key, (get("os"), get("host_meta", {}))
                 )
-                protocol = item.get("protocol")
-                service_name = item.get("service_name")
-                product = item.get("product")
-                version = item.get("version")
-                banner = item.get("banner")
-                service_meta = item.get("service_meta", {})
-                service_id = None
+
+                port = get("port")
+                port = int(port) if port is not None and str(port).isdigit() else None
+                protocol = get("protocol")
+                service_name = get("service_name")
+                service_key = None
                 if port and protocol and service_name:
-                    service_id = get_or_create_service(
-                        cursor,
-                        host_id,
-                        port,
-                        protocol,
-                        service_name,
-                        product,
-                        version,
-                        banner,
-                        plugin_name,
-                        service_meta,
+                    service_key = (host_key, port, protocol, service_name, plugin_name)
+                    service_rows.setdefault(
+                        service_key,
+                        (
+                            get("product"),
+                            get("version"),
+                            get("banner"),
+                            get("service_meta", {}),
+                        ),
                     )
 
-                category = next(
-                    (
-                        p.get("category", "General Info")
-                        for p in PLUGINS
-                        if p["name"] == plugin_name
-                    ),
-                    "General Info",
-                )
-                severity = item.get("severity", "info")
-                title = item.get("title") or item.get("msg") or "Finding"
-                description = (
-                    item.get("description") or item.get("script_output") or "-"
-                )
-                refs = item.get("refs")
+                refs = get("refs")
                 if isinstance(refs, str):
                     refs = [refs]
-                vuln_meta = item.get("vuln_meta", {})
                 source = (
-                    item.get("source") or (item.get("meta") or {}).get("source") or "-"
+                    get("source") or (get("meta") or {}).get("source") or "-"
                 )
-                vuln_id = create_vuln(
-                    cursor,
-                    service_id,
-                    host_id,
+                vuln = (
                     plugin_name,
                     source,
                     category,
-                    severity,
-                    title,
-                    description,
+                    get("severity", "info"),
+                    get("title") or get("msg") or "Finding",
+                    get("description") or get("script_output") or "-",
                     refs,
-                    vuln_meta,
+                    get("vuln_meta", {}),
                 )
 
-                evidence_path = item.get("evidence_path")
-                evidence_type = item.get("evidence_type", source)
+                evidence = []
+                evidence_path = get("evidence_path")
                 if evidence_path:
-                    create_evidence(
-                        cursor, vuln_id, plugin_name, evidence_type, evidence_path, None
+                    evidence.append(
+                        (
+                            plugin_name,
+                            get("evidence_type", source),
+                            evidence_path,
+                            None,
+                        )
                     )
-
-                evidence = item.get("evidence")
-                if evidence or item.get("raw_log") or item.get("log_path"):
-                    create_evidence(
-                        cursor,
-                        vuln_id,
-                        plugin_name,
-                        item.get("log_type", "raw"),
-                        item.get("log_path"),
-                        evidence or item.get("raw_log", ""),
+                raw_evidence = get("evidence")
+                if raw_evidence or get("raw_log") or get("log_path"):
+                    evidence.append(
+                        (
+                            plugin_name,
+                            get("log_type", "raw"),
+                            get("log_path"),
+                            raw_evidence or get("raw_log", ""),
+                        )
                     )
 
-                total_added += 1
+                records.append((host_key, service_key, vuln, evidence))
+                plugin_added += 1
             except Exception as e:
-                logging.warning(f"Error inserting data from {plugin_name}: {e}")
+                logging.warning(f"Error preparing data from {plugin_name}: {e}")
                 continue
 
-        logging.info(f"[{plugin_name}] Records added: {total_added}")
+        logging.info(f"[{plugin_name}] Records prepared: {plugin_added}")
+
+    if not records:
+        return 0
+
+    # Pass 2: one batched statement per table.
+    ensure_hosts_index(cursor)
+    host_ids = insert_hosts(cursor, host_rows)
+    service_ids = insert_services(
+        cursor,
+        {
+            (host_ids[key[0]],) + key[1:]: value
+            for key, value in service_rows.items()
+        },
+    )
+
+    vuln_rows = []
+    for host_key, service_key, vuln, _ in records:
+        host_id = host_ids[host_key]
+        service_id = None
+        if service_key:
+            service_id = service_ids[(host_id,) + service_key[1:]]
+        vuln_rows.append((service_id, host_id) + vuln)
+    vuln_ids = insert_vulns(cursor, vuln_rows)
+
+    evidence_rows = [
+        (vuln_id,) + ev
+        for vuln_id, (_, _, _, evidence) in zip(vuln_ids, records)
+        for ev in evidence
+    ]
+    copy_rows(cursor, "evidence", EVIDENCE_COLUMNS, evidence_rows)
 
-    return total_added
+    return len(records)
 
 
 def collect(temp_files=None, purge_only=False):
@@ -371,8 +506,7 @@ if __name__ == "__main__":
     elif args.temp_file:
         if os.path.exists(args.temp_file):
             try:
-                with open(args.temp_file, "r", encoding="utf-8") as f:
-                    temp_data = json.load(f)
+                temp_data = load_json(args.temp_file)
 
                 if isinstance(temp_data, dict) and "paths" in temp_data:
                     temp_files = temp_data["paths"]
@@ -0,0 +1,34 @@
+import json
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+CONFIG_CACHE = {}
+
+
+def load_json(path):
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+def get_config(path=CONFIG_PATH):
+    """
+    Return the parsed config.json. The file is only re-read when its mtime
+    or size changes, so every module in a process shares one parse.
+    """
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = CONFIG_CACHE.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    config = load_json(path)
+    CONFIG_CACHE[path] = (key, config)
+    return config
@@ -1,5 +1,8 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOGS_DIR = os.path.join(ROOT_DIR, "logs")
@@ -7,6 +10,39 @@ CONTAINER_LOG_PATH = os.path.join(LOGS_DIR, "container.log")
 
 os.makedirs(LOGS_DIR, exist_ok=True)
 
+LOG_LISTENERS = {}
+
+
+def _stop_listener(path):
+    listener = LOG_LISTENERS.pop(path, None)
+    if listener:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def stop_log_listeners():
+    for path in list(LOG_LISTENERS):
+        _stop_listener(path)
+
+
+atexit.register(stop_log_listeners)
+
+
+def add_queued_file_handler(logger, path, formatter):
+    """
+    Attach a FileHandler to the logger through a QueueListener thread,
+    so logging calls from the asyncio loop never block on disk writes.
+    """
+    _stop_listener(path)
+    file_handler = logging.FileHandler(path, mode="a", encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    LOG_LISTENERS[path] = listener
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
 
 def clear_container_log_if_needed(config: dict):
     """
@@ -26,8 +62,11 @@ def setup_container_logger():
     """
     This code runs INSIDE the container.
     It does not attempt to clear the file, it only writes to it.
+    Repeated calls in the same process are no-ops.
     """
     logger = logging.getLogger()
+    if CONTAINER_LOG_PATH in LOG_LISTENERS:
+        return
     logger.setLevel(logging.INFO)
 
     if logger.hasHandlers():
@@ -35,10 +74,8 @@ def setup_container_logger():
             logger.removeHandler(handler)
             handler.close()
 
-    handler = logging.FileHandler(CONTAINER_LOG_PATH, mode="a", encoding="utf-8")
     formatter = logging.Formatter(
         fmt="%(asctime)s [%(levelname)s] - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    add_queued_file_handler(logger, CONTAINER_LOG_PATH, formatter)
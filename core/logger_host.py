@@ -12,6 +12,11 @@ def setup_host_logger(config: dict):
     clear_logs = config.get("scan_config", {}).get("clear_logs", False)
 
     logger = logging.getLogger()
+    if any(
+        getattr(handler, "baseFilename", None) == HOST_LOG_PATH
+        for handler in logger.handlers
+    ):
+        return
     logger.setLevel(logging.INFO)
 
     if logger.hasHandlers():
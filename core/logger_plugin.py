@@ -1,6 +1,8 @@
 import logging
 import os
 
+from core.logger_container import LOG_LISTENERS, add_queued_file_handler
+
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOGS_DIR = os.path.join(ROOT_DIR, "logs")
 
@@ -15,18 +17,18 @@ def setup_plugin_logger(plugin_name: str):
     logger.setLevel(logging.INFO)
 
     log_path = os.path.join(LOGS_DIR, f"{plugin_name}.log")
+    if log_path in LOG_LISTENERS:
+        return logger
 
     if logger.hasHandlers():
         for handler in logger.handlers[:]:
             logger.removeHandler(handler)
             handler.close()
 
-    file_handler = logging.FileHandler(log_path, mode="a", encoding="utf-8")
     formatter = logging.Formatter(
         fmt="%(asctime)s [%(levelname)s] - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
     )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    add_queued_file_handler(logger, log_path, formatter)
 
     logger.propagate = False
     return logger
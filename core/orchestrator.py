@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+from collections import defaultdict, deque
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
@@ -22,49 +23,46 @@ def build_dependency_graph(plugin_configs):
     return graph
 
 
-def topological_sort(graph):
-    from collections import defaultdict, deque
-
-    in_degree = defaultdict(int)
+def build_successors(graph):
+    successors = defaultdict(list)
     for node, deps in graph.items():
         for dep in deps:
-            in_degree[node] += 1
+            successors[dep].append(node)
+    return successors
+
+
+def topological_sort(graph):
+    in_degree = {node: len(deps) for node, deps in graph.items()}
+    successors = build_successors(graph)
     queue = deque([node for node in graph if in_degree[node] == 0])
     result = []
     while queue:
         node = queue.popleft()
         result.append(node)
-        for neighbor in graph:
-            if node in graph[neighbor]:
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
+        for neighbor in successors[node]:
+            in_degree[neighbor] -= 1
+            if in_degree[neighbor] == 0:
+                queue.append(neighbor)
     if len(result) != len(graph):
         raise RuntimeError("Cyclic dependency detected among plugins!")
     return result
 
 
-async def orchestrate(config):
-    from core.plugin_runner import run_plugin
-
+async def orchestrate(config, run_plugin):
     enabled_plugins = [p for p in config.get("plugins", []) if p.get("enabled")]
     graph = build_dependency_graph(enabled_plugins)
     sorted_plugins = topological_sort(graph)
     print(f"\n[SORTED PLUGINS]: {sorted_plugins}\n")
     plugins_by_name = {p["name"]: p for p in enabled_plugins}
 
+    position = {name: i for i, name in enumerate(sorted_plugins)}
+    successors = build_successors(graph)
+    remaining = {name: len(deps) for name, deps in graph.items()}
+
     results = {}
     plugin_durations = {}
-    executed = set()
-    while len(executed) < len(sorted_plugins):
-        to_run = []
-        for name in sorted_plugins:
-            if name in executed:
-                continue
-            deps = graph[name]
-            if deps.issubset(executed):
-                to_run.append(name)
-
+    to_run = [name for name in sorted_plugins if remaining[name] == 0]
+    while to_run:
         tasks = []
         for name in to_run:
             plugin_conf = plugins_by_name[name]
@@ -76,11 +74,16 @@ async def orchestrate(config):
             tasks.append(run_plugin(merged_config))
         batch_results = await asyncio.gather(*tasks)
 
+        next_run = []
         for i, name in enumerate(to_run):
             plugin_name, (paths, duration) = batch_results[i]
             results[plugin_name] = paths
             plugin_durations[plugin_name] = duration
-            executed.add(name)
+            for successor in successors[name]:
+                remaining[successor] -= 1
+                if remaining[successor] == 0:
+                    next_run.append(successor)
+        to_run = sorted(next_run, key=position.__getitem__)
 
     return results, plugin_durations
 
@@ -91,5 +94,7 @@ if __name__ == "__main__":
     config_path = sys.argv[1] if len(sys.argv) > 1 else CONFIG_PATH
     with open(config_path, "r", encoding="utf-8") as f:
         config = json.load(f)
-    res, durs = asyncio.run(orchestrate(config))
+    from core.plugin_runner import run_plugin
+
+    res, durs = asyncio.run(orchestrate(config, run_plugin))
     print(json.dumps({"results": res, "durations": durs}, indent=2, ensure_ascii=False))
@@ -5,6 +5,7 @@ sys.path.insert(0, "/")
 
 import argparse
 import asyncio
+import functools
 import importlib.util
 import json
 import logging
@@ -12,15 +13,27 @@ import shutil
 import subprocess
 import time
 
+from core.config import get_config, load_json
 from core.logger_container import setup_container_logger
 from core.logger_plugin import clear_plugin_logs_if_needed
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
 PLUGINS_DIR = os.path.join(ROOT_DIR, "plugins")
+VERSION_CACHE_PATH = os.path.join(ROOT_DIR, "logs", ".version_cache.json")
 
-with open(CONFIG_PATH) as f:
-    CONFIG = json.load(f)
+try:
+    import orjson
+
+    def _json_dump_bytes(value):
+        return orjson.dumps(value)
+
+except ImportError:
+
+    def _json_dump_bytes(value):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+CONFIG = get_config()
 
 setup_container_logger()
 clear_plugin_logs_if_needed(CONFIG)
@@ -34,14 +47,26 @@ if not TARGET_IP and not TARGET_DOMAIN:
         "Neither target_ip nor target_domain is specified in the config. Please provide at least one."
     )
 
+PLUGIN_MODULES = {}
+INSTALL_RESULTS = {}
+
+
+def load_plugin(name, plugin_path):
+    module = PLUGIN_MODULES.get(name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(name, plugin_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        PLUGIN_MODULES[name] = module
+    return module
+
 
+@functools.lru_cache(maxsize=None)
 def is_tool_installed(tool_name):
     try:
         plugin_path = os.path.join(PLUGINS_DIR, f"{tool_name}.py")
         if os.path.exists(plugin_path):
-            spec = importlib.util.spec_from_file_location(tool_name, plugin_path)
-            plugin_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(plugin_module)
+            plugin_module = load_plugin(tool_name, plugin_path)
             if hasattr(plugin_module, "is_installed"):
                 return plugin_module.is_installed()
     except Exception as e:
@@ -50,19 +75,76 @@ def is_tool_installed(tool_name):
     return shutil.which(tool_name) is not None
 
 
+VERSION_CACHE = None
+
+
+def load_version_cache():
+    global VERSION_CACHE
+    if VERSION_CACHE is None:
+        try:
+            VERSION_CACHE = load_json(VERSION_CACHE_PATH)
+        except (OSError, ValueError):
+            VERSION_CACHE = {}
+    return VERSION_CACHE
+
+
+def save_version_cache():
+    try:
+        with open(VERSION_CACHE_PATH, "wb") as f:
+            f.write(_json_dump_bytes(VERSION_CACHE))
+    except OSError as e:
+        logging.warning(f"Failed to save tool version cache: {e}")
+
+
 def get_tool_version(tool_name, version_arg="--version"):
+    """
+    Return the tool's version output. Results are cached on disk keyed by the
+    binary's path and mtime, so the tool is only executed again after it changes.
+    """
+    path = shutil.which(tool_name)
+    if not path:
+        return None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    cache = load_version_cache()
+    key = f"{path} {version_arg}"
+    entry = cache.get(key)
+    if entry and entry.get("mtime") == mtime:
+        return entry["version"]
+
     try:
         result = subprocess.run(
-            [tool_name, version_arg], capture_output=True, text=True
+            [path, version_arg], capture_output=True, text=True, timeout=5
         )
         if result.returncode == 0:
-            return result.stdout.strip()
+            version = result.stdout.strip()
+            cache[key] = {"mtime": mtime, "version": version}
+            save_version_cache()
+            return version
     except Exception:
         pass
     return None
 
 
-async def install_plugin(plugin):
+async def run_install_command(cmd, done_cmds):
+    if cmd not in done_cmds:
+        logging.info(f"Executing command: {cmd}")
+        process = await asyncio.create_subprocess_shell(
+            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        done_cmds[cmd] = (process.returncode, stderr.decode().strip())
+        # Any executed command may have installed, upgraded or removed a tool.
+        is_tool_installed.cache_clear()
+    return done_cmds[cmd]
+
+
+async def install_plugin(plugin, done_cmds=None):
+    if done_cmds is None:
+        done_cmds = {}
     name = plugin["name"]
     required_version = plugin.get("version")
     install_cmds = plugin.get("install", [])
@@ -79,13 +161,7 @@ async def install_plugin(plugin):
                 for cmd in install_cmds:
                     if "install" in cmd:
                         cmd = cmd.replace("install -y", "install --reinstall -y")
-                    logging.info(f"Executing command: {cmd}")
-                    process = await asyncio.create_subprocess_shell(
-                        cmd,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE,
-                    )
-                    await process.communicate()
+                    await run_install_command(cmd, done_cmds)
                 return True
             else:
                 logging.info(f"{name} is already up to date.")
@@ -100,20 +176,26 @@ async def install_plugin(plugin):
     for cmd in install_cmds:
         if not is_root:
             cmd = f"sudo {cmd}"
-        logging.info(f"Executing command: {cmd}")
-        process = await asyncio.create_subprocess_shell(
-            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
-        if process.returncode != 0:
-            logging.error(
-                f"Installation of {name} failed on command: {cmd}\n{stderr.decode().strip()}"
-            )
+        returncode, stderr = await run_install_command(cmd, done_cmds)
+        if returncode != 0:
+            logging.error(f"Installation of {name} failed on command: {cmd}\n{stderr}")
             return False
     logging.info(f"{name} installed successfully.")
     return True
 
 
+async def install_plugins(plugins):
+    """
+    Install dependencies for all enabled plugins in one sequential pass before
+    scanning, so package managers never contend for their locks and commands
+    shared by several plugins run only once.
+    """
+    done_cmds = {}
+    for plugin in plugins:
+        if plugin.get("enabled"):
+            INSTALL_RESULTS[plugin["name"]] = await install_plugin(plugin, done_cmds)
+
+
 async def run_plugin(plugin):
     name = plugin["name"]
 
@@ -121,7 +203,9 @@ async def run_plugin(plugin):
         logging.info(f"Plugin {name} is disabled in config. Skipping.")
         return name, ([], 0)
 
-    success = await install_plugin(plugin)
+    success = INSTALL_RESULTS.get(name)
+    if success is None:
+        success = await install_plugin(plugin)
     if not success:
         return name, ([], 0)
 
@@ -131,9 +215,7 @@ async def run_plugin(plugin):
         return name, ([], 0)
 
     try:
-        spec = importlib.util.spec_from_file_location(name, plugin_path)
-        loaded_plugin = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(loaded_plugin)
+        loaded_plugin = load_plugin(name, plugin_path)
 
         if hasattr(loaded_plugin, "scan"):
             logging.info(f"Running scan() from plugin {name}...")
@@ -167,11 +249,12 @@ def plugins_have_dependencies(plugins):
 
 
 async def main():
+    await install_plugins(PLUGINS)
     if plugins_have_dependencies(PLUGINS):
         from core.orchestrator import orchestrate
 
         logging.info("Dependencies between plugins detected, running orchestrator!")
-        results, duration_map = await orchestrate(CONFIG)
+        results, duration_map = await orchestrate(CONFIG, run_plugin)
         generated_temp_paths = []
         for plugin, plugin_paths in results.items():
             if isinstance(plugin_paths, list):
@@ -210,8 +293,8 @@ if __name__ == "__main__":
     }
 
     try:
-        with open(args.output, "w", encoding="utf-8") as f:
-            json.dump(combined_data, f, ensure_ascii=False, indent=2)
+        with open(args.output, "wb") as f:
+            f.write(_json_dump_bytes(combined_data))
         logging.info(f"Saved paths and duration data: {args.output}")
     except Exception as e:
         logging.error(f"Error writing JSON files: {e}")
@@ -1,25 +1,45 @@
-import json
-import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
-import psycopg2
+from psycopg2.extras import Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
-ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
+from core.config import get_config
 
-with open(CONFIG_PATH, "r") as f:
-    CONFIG = json.load(f)
+CONFIG = get_config()
 DB_CONFIG = CONFIG["database"]
 
 
+DB_POOL = None
+DB_POOL_LOCK = threading.Lock()
+
+
+def get_pool():
+    global DB_POOL
+    with DB_POOL_LOCK:
+        if DB_POOL is None:
+            DB_POOL = ThreadedConnectionPool(
+                1,
+                4,
+                database=DB_CONFIG["POSTGRES_DB"],
+                user=DB_CONFIG["POSTGRES_USER"],
+                password=DB_CONFIG["POSTGRES_PASSWORD"],
+                host=DB_CONFIG["POSTGRES_HOST"],
+                port=DB_CONFIG["POSTGRES_PORT"],
+            )
+        return DB_POOL
+
+
+@contextmanager
 def connect():
-    return psycopg2.connect(
-        database=DB_CONFIG["POSTGRES_DB"],
-        user=DB_CONFIG["POSTGRES_USER"],
-        password=DB_CONFIG["POSTGRES_PASSWORD"],
-        host=DB_CONFIG["POSTGRES_HOST"],
-        port=DB_CONFIG["POSTGRES_PORT"],
-    )
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
 
 
 def add_target(
@@ -32,36 +52,77 @@ def add_target(
     meta=None,
     status="new",
 ):
-    tags = tags or []
-    meta = meta or {}
+    return add_targets_bulk(
+        [
+            {
+                "target_type": target_type,
+                "target_value": target_value,
+                "port": port,
+                "protocol": protocol,
+                "source_plugin": source_plugin,
+                "tags": tags,
+                "meta": meta,
+                "status": status,
+            }
+        ]
+    )[0]
+
+
+def add_targets_bulk(targets):
+    """
+    Upsert many targets (dicts with add_target's keyword arguments) in
+    batches of 1000 rows. Returns the ids of the distinct targets in order.
+    """
     now = datetime.now()
+    rows = {}
+    for target in targets:
+        port = target.get("port")
+        if isinstance(port, str) and port.isdigit():
+            port = int(port)
+        protocol = target.get("protocol")
+        key = (target["target_type"], target["target_value"], port, protocol)
+        if port is None or protocol is None:
+            # NULLs never conflict in the unique constraint, so keep every row.
+            key = (key, len(rows))
+        status = target.get("status", "new")
+        if key in rows:
+            # A later duplicate only updates the status, as ON CONFLICT would.
+            rows[key] = rows[key][:5] + (status,) + rows[key][6:]
+            continue
+        rows[key] = (
+            target["target_type"],
+            target["target_value"],
+            port,
+            protocol,
+            target.get("source_plugin"),
+            status,
+            target.get("tags") or [],
+            Json(target.get("meta") or {}),
+            now,
+            now,
+        )
+    if not rows:
+        return []
+
     with connect() as conn:
         with conn.cursor() as cur:
-            cur.execute(
+            result = execute_values(
+                cur,
                 """
                 INSERT INTO registry (target_type, target_value, port, protocol, source_plugin, status, tags, meta, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                VALUES %s
                 ON CONFLICT (target_type, target_value, port, protocol)
                 DO UPDATE SET
                     status = EXCLUDED.status,
                     updated_at = EXCLUDED.updated_at
                 RETURNING id;
                 """,
-                (
-                    target_type,
-                    target_value,
-                    port,
-                    protocol,
-                    source_plugin,
-                    status,
-                    tags,
-                    json.dumps(meta, ensure_ascii=False),
-                    now,
-                    now,
-                ),
+                list(rows.values()),
+                template="(%s,%s,%s,%s,%s,%s,%s::text[],%s,%s,%s)",
+                page_size=1000,
+                fetch=True,
             )
-            conn.commit()
-            return cur.fetchone()[0]
+            return [row[0] for row in result]
 
 
 def get_targets(
@@ -71,23 +132,26 @@ def get_targets(
     filter_tags=None,
     protocol=None,
 ):
-    query = "SELECT id, target_type, target_value, port, protocol, status, tags, meta FROM registry WHERE 1=1"
+    query = "SELECT id, target_type, target_value, port, protocol, status, tags, meta FROM registry"
+    conditions = []
     params = []
     if filter_status:
-        query += " AND status = %s"
+        conditions.append("status = %s")
         params.append(filter_status)
     if filter_type:
-        query += " AND target_type = %s"
+        conditions.append("target_type = %s")
         params.append(filter_type)
     if filter_plugin:
-        query += " AND source_plugin = %s"
+        conditions.append("source_plugin = %s")
         params.append(filter_plugin)
     if filter_tags:
-        query += " AND tags && %s"
+        conditions.append("tags && %s::text[]")
         params.append(filter_tags)
     if protocol:
-        query += " AND protocol = %s"
+        conditions.append("protocol = %s")
         params.append(protocol)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
     with connect() as conn:
         with conn.cursor() as cur:
             cur.execute(query, params)
@@ -102,14 +166,12 @@ def update_target_status(target_id, new_status):
                 "UPDATE registry SET status = %s, updated_at = %s WHERE id = %s",
                 (new_status, now, target_id),
             )
-            conn.commit()
 
 
 def delete_target(target_id):
     with connect() as conn:
         with conn.cursor() as cur:
             cur.execute("DELETE FROM registry WHERE id = %s", (target_id,))
-            conn.commit()
 
 
 if __name__ == "__main__":
@@ -10,10 +10,12 @@ import logging
 import re
 import shutil
 import textwrap
-from collections import OrderedDict, defaultdict
+from collections import defaultdict
 from datetime import datetime
 
 import psycopg2
+from psycopg2.extras import RealDictCursor, register_default_jsonb
+from core.config import get_config
 from core.logger_container import setup_container_logger
 from jinja2 import Environment, FileSystemLoader
 from rich.console import Console
@@ -27,11 +29,11 @@ TEMPLATES_DIR = os.path.join(ROOT_DIR, "templates")
 OUTPUT_DIR = os.path.join(ROOT_DIR, "reports")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
-with open(CONFIG_PATH, "r") as f:
-    CONFIG = json.load(f)
+CONFIG = get_config()
 DB_CONFIG = CONFIG["database"]
 PLUGINS = CONFIG.get("plugins", [])
+PLUGIN_MODULES = {}
+EMPTY_VALUES = frozenset(("-", "", "None", "null", "0"))
 
 
 def connect_to_db():
@@ -44,6 +46,9 @@ def connect_to_db():
     )
 
 
+TITLE_LINE_RE = re.compile(r"^[A-Za-z0-9_.:-]+:$")
+
+
 def highlight_keywords(text):
     if not isinstance(text, str):
         return text
@@ -77,7 +82,7 @@ def highlight_keywords(text):
         if line.startswith("[") and line.endswith("]"):
             flush()
             html.append(f"<strong>{line}</strong>")
-        elif re.match(r"^[A-Za-z0-9_.:-]+:$", line):
+        elif line.endswith(":") and TITLE_LINE_RE.match(line):
             flush()
             current_title = line.rstrip(":")
         else:
@@ -92,67 +97,60 @@ def get_jinja_env():
     return env
 
 
-def categorize_results(entries):
-    plugin_categories = {
-        plugin["name"]: plugin.get("category", "General Info") for plugin in PLUGINS
-    }
-    plugin_order = {plugin["name"]: idx for idx, plugin in enumerate(PLUGINS)}
-    structured = defaultdict(dict)
-    global_meta = {"created_at": None}
-    for entry in entries:
-        plugin = entry.get("plugin")
-        category = plugin_categories.get(plugin, "General Info")
-        if plugin not in structured[category]:
-            structured[category][plugin] = []
-        structured[category][plugin].append(entry)
-        if global_meta["created_at"] is None and entry.get("created_at"):
-            global_meta["created_at"] = entry["created_at"]
-    for cat in structured:
-        structured[cat] = OrderedDict(
-            sorted(structured[cat].items(), key=lambda x: plugin_order.get(x[0], 999))
-        )
-    return structured, global_meta
-
-
-def sort_categories_by_priority(raw_results):
-    category_order = CONFIG.get("report_category_order", [])
-    order = {cat: idx for idx, cat in enumerate(category_order)}
-    return OrderedDict(
-        sorted(raw_results.items(), key=lambda item: order.get(item[0], 999))
-    )
-
-
 def load_snapshot():
     conn = connect_to_db()
-    cursor = conn.cursor()
+    register_default_jsonb(conn, loads=load_jsonb)
     result = {}
 
-    for table in ["hosts", "services", "vuln", "evidence", "registry"]:
-        cursor.execute(f"SELECT * FROM {table}")
-        rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        result[table] = [dict(zip(columns, row)) for row in rows]
+    with conn:
+        for table in ["hosts", "services", "vuln", "evidence", "registry"]:
+            with conn.cursor(
+                name=f"snapshot_{table}", cursor_factory=RealDictCursor
+            ) as cursor:
+                cursor.itersize = 10000
+                cursor.execute(f"SELECT * FROM {table}")
+                result[table] = list(cursor)
 
-    cursor.close()
     conn.close()
     meta = {"created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
     return result, meta
 
 
+def load_plugin_module(name):
+    """
+    Import plugins.<name> once per process; a failed import is remembered as
+    None so later renders do not retry it.
+    """
+    if name not in PLUGIN_MODULES:
+        try:
+            PLUGIN_MODULES[name] = importlib.import_module(f"plugins.{name}")
+        except Exception:
+            PLUGIN_MODULES[name] = None
+    return PLUGIN_MODULES[name]
+
+
+def index_by_plugin(*row_lists):
+    by_plugin = defaultdict(list)
+    for rows in row_lists:
+        for row in rows:
+            by_plugin[row.get("plugin")].append(row)
+    return by_plugin
+
+
 def build_structured_results(snapshot):
     structured = {}
+    vuln_by_plugin = index_by_plugin(snapshot.get("vuln", []))
     for plugin_cfg in PLUGINS:
         if not plugin_cfg.get("enabled", False):
             continue
         plugin = plugin_cfg["name"]
-        try:
-            plugin_mod = importlib.import_module(f"plugins.{plugin}")
-        except Exception:
+        plugin_mod = load_plugin_module(plugin)
+        if plugin_mod is None:
             continue
         if hasattr(plugin_mod, "get_view_rows"):
             entries = plugin_mod.get_view_rows(snapshot)
         else:
-            entries = [v for v in snapshot.get("vuln", []) if v.get("plugin") == plugin]
+            entries = list(vuln_by_plugin.get(plugin, []))
         category = plugin_cfg.get("category", "General Info")
         if category not in structured:
             structured[category] = {}
@@ -160,6 +158,17 @@ def build_structured_results(snapshot):
     return structured
 
 
+def write_report(output_path, data):
+    """
+    Write encoded report bytes next to output_path and move them into place,
+    so a crash never leaves a half-written report behind.
+    """
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
+
+
 def render_html(results, output_path, meta, duration_map):
     logging.info(f"Searching templates in: {TEMPLATES_DIR}")
     env = get_jinja_env()
@@ -193,43 +202,60 @@ def render_html(results, output_path, meta, duration_map):
         evidence_map=evidence_map,
     )
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(rendered)
+    write_report(output_path, rendered.encode("utf-8"))
     logging.info(f"HTML report created: {output_path}")
 
 
-def fix_datetimes(obj):
-    if isinstance(obj, dict):
-        return {k: fix_datetimes(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [fix_datetimes(x) for x in obj]
-    elif isinstance(obj, datetime):
+def json_default(obj):
+    if isinstance(obj, datetime):
         return obj.strftime("%Y-%m-%d %H:%M:%S")
-    return obj
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+try:
+    import orjson
+
+    load_jsonb = orjson.loads
+
+    def dump_json_report(payload):
+        return orjson.dumps(
+            payload,
+            default=json_default,
+            option=orjson.OPT_INDENT_2
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+except ImportError:
+    load_jsonb = json.loads
+
+    def dump_json_report(payload):
+        return json.dumps(
+            payload, ensure_ascii=False, indent=2, default=json_default
+        ).encode()
 
 
 def export_json_report(results, meta, duration_map, output_path):
     payload = {
-        "snapshot": fix_datetimes(results),
+        "snapshot": results,
         "meta": meta,
         "duration_map": duration_map,
         "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "config": CONFIG,
     }
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    write_report(output_path, dump_json_report(payload))
     logging.info(f"JSON report saved: {output_path}")
 
 
 def export_txt_report(snapshot, meta, duration_map, output_path):
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(f"# HoneyScan Report\nGenerated at: {meta.get('created_at')}\n\n")
-        for table, rows in snapshot.items():
-            f.write(f"## {table.upper()}\n")
-            for row in rows:
-                for k, v in row.items():
-                    f.write(f"- {k}: {v}\n")
-                f.write("\n")
+    lines = [f"# HoneyScan Report\nGenerated at: {meta.get('created_at')}\n\n"]
+    for table, rows in snapshot.items():
+        lines.append(f"## {table.upper()}\n")
+        for row in rows:
+            for k, v in row.items():
+                lines.append(f"- {k}: {v}\n")
+            lines.append("\n")
+    write_report(output_path, "".join(lines).encode("utf-8"))
 
 
 def generate_pdf(html_path, pdf_path):
@@ -248,24 +274,18 @@ def wrap_cell(value, width=80):
 def show_in_terminal(snapshot, duration_map):
     terminal_width = shutil.get_terminal_size((160, 20)).columns
     console = Console(width=terminal_width)
+    rows_by_plugin = index_by_plugin(*snapshot.values())
     for plugin_cfg in CONFIG["plugins"]:
         plugin_name = plugin_cfg["name"]
         if not plugin_cfg.get("enabled", False):
             continue
 
-        try:
-            plugin_module = importlib.import_module(f"plugins.{plugin_name}")
-        except Exception:
-            plugin_module = None
+        plugin_module = load_plugin_module(plugin_name)
 
         if plugin_module and hasattr(plugin_module, "get_view_rows"):
             all_data = plugin_module.get_view_rows(snapshot)
         else:
-            all_data = []
-            for table_name, rows in snapshot.items():
-                for row in rows:
-                    if row.get("plugin") == plugin_name:
-                        all_data.append(row)
+            all_data = list(rows_by_plugin.get(plugin_name, []))
 
         if not all_data:
             continue
@@ -281,26 +301,30 @@ def show_in_terminal(snapshot, duration_map):
         if important_fields:
 
             def is_meaningful(entry):
-                return not all(
-                    str(entry.get(k, "-")).strip() in ["-", "", "null", "None", "0"]
+                return any(
+                    str(entry.get(k, "-")).strip() not in EMPTY_VALUES
                     for k in important_fields
                 )
 
             all_data = [d for d in all_data if is_meaningful(d)]
 
         if merge_enabled:
+            # key -> [first row, merged source set or None if not duplicated]
             seen = {}
             for d in all_data:
                 key = (d.get("port"), d.get("protocol"), d.get("service_name"))
-                if key in seen:
-                    existing = seen[key]
-                    existing_sources = set(str(existing.get("source", "")).split("+"))
-                    new_sources = set(str(d.get("source", "")).split("+"))
-                    combined_sources = sorted(existing_sources.union(new_sources))
-                    existing["source"] = "+".join(combined_sources)
-                else:
-                    seen[key] = d
-            unique_data = list(seen.values())
+                bucket = seen.get(key)
+                if bucket is None:
+                    seen[key] = [d, None]
+                    continue
+                if bucket[1] is None:
+                    bucket[1] = set(str(bucket[0].get("source", "")).split("+"))
+                bucket[1].update(str(d.get("source", "")).split("+"))
+            unique_data = []
+            for row, sources in seen.values():
+                if sources is not None:
+                    row["source"] = "+".join(sorted(sources))
+                unique_data.append(row)
         else:
             unique_data = all_data
 
@@ -398,7 +422,7 @@ def main(format=None, timestamp=None, clear_reports=False):
 
     formats = CONFIG.get("scan_config", {}).get("report_formats", ["html"])
     if format:
-        formats = [format]
+        formats = [f.strip() for f in format.split(",") if f.strip()]
 
     results, meta = load_snapshot()
 
@@ -436,7 +460,9 @@ def main(format=None, timestamp=None, clear_reports=False):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--format", help="Single format for backward compatibility")
+    parser.add_argument(
+        "--format", help="Report format or comma-separated list (e.g. html,pdf)"
+    )
     parser.add_argument("--timestamp", help="Timestamp to use in output filename")
     parser.add_argument(
         "--clear-reports",
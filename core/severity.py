@@ -42,6 +42,17 @@ SEVERITY_KEYWORDS = {
 }
 
 
+def compile_keywords(patterns):
+    """Join a severity's patterns into one case-insensitive alternation."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+COMPILED_KEYWORDS = {
+    severity: compile_keywords(patterns)
+    for severity, patterns in SEVERITY_KEYWORDS.items()
+}
+
+
 def classify_severity(entry, custom_keywords=None):
     """
     Classify severity level for scanner results.
@@ -74,18 +85,19 @@ def classify_severity(entry, custom_keywords=None):
     if state == "open":
         pass  # see below; if nothing found — will be medium
 
-    keywords = SEVERITY_KEYWORDS.copy()
+    compiled = COMPILED_KEYWORDS
     if custom_keywords:
+        compiled = dict(COMPILED_KEYWORDS)
         for sev, patterns in custom_keywords.items():
-            if sev not in keywords:
-                keywords[sev] = []
-            keywords[sev].extend(patterns)
+            if patterns:
+                compiled[sev] = compile_keywords(
+                    SEVERITY_KEYWORDS.get(sev, []) + list(patterns)
+                )
 
     for severity in SEVERITY_LEVELS:
-        patterns = keywords.get(severity, [])
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return severity
+        regex = compiled.get(severity)
+        if regex and regex.search(text):
+            return severity
 
     if state == "open":
         return "medium"
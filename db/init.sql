@@ -25,6 +25,7 @@ CREATE TABLE hosts (
 
 CREATE INDEX idx_hosts_ip ON hosts (ip);
 CREATE INDEX idx_hosts_fqdn ON hosts (fqdn);
+CREATE UNIQUE INDEX idx_hosts_ip_fqdn ON hosts (ip, fqdn) NULLS NOT DISTINCT;
 
 CREATE TABLE services (
     id SERIAL PRIMARY KEY,
@@ -101,6 +102,7 @@ CREATE TABLE registry (
 CREATE INDEX idx_registry_target_value ON registry (target_value);
 CREATE INDEX idx_registry_target_type ON registry (target_type);
 CREATE INDEX idx_registry_status ON registry (status);
+CREATE INDEX idx_registry_filter ON registry (status, target_type, source_plugin, protocol);
 CREATE INDEX idx_registry_tags ON registry USING GIN (tags);
 CREATE INDEX idx_registry_meta ON registry USING GIN (meta);
 CREATE INDEX idx_registry_host_id ON registry (host_id);
@@ -39,12 +39,12 @@ def connect():
 def purge():
     conn = connect()
     cur = conn.cursor()
-    for table in PURGE_TABLES:
-        try:
-            cur.execute(f"DELETE FROM {table};")
-            print(f"🗑 Cleared table {table}.")
-        except Exception as e:
-            print(f"⚠️ Error while clearing {table}: {e}")
+    tables = ", ".join(PURGE_TABLES)
+    try:
+        cur.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE;")
+        print(f"🗑 Cleared tables {tables}.")
+    except Exception as e:
+        print(f"⚠️ Error while clearing {tables}: {e}")
     conn.commit()
     cur.close()
     conn.close()
@@ -1,24 +1,39 @@
 import json
 import os
+import re
 
 CONFIG_PATH = "/tmp/config.json"
 SCRIPT_PATH = "/tmp/tools_install.sh"
+APT_UPDATE_RE = re.compile(r"^(sudo )?apt-get update$")
+APT_INSTALL_RE = re.compile(r"^(sudo )?apt-get install\s+-y\s+([^;&|]+)$")
 
 with open(CONFIG_PATH) as f:
     config = json.load(f)
 
 seen = set()
 commands = []
+apt_packages = set()
 
 for plugin in config.get("plugins", []):
     if plugin.get("enabled") and plugin.get("install"):
         for cmd in plugin["install"]:
-            if cmd not in seen:
+            cmd = cmd.strip()
+            if APT_UPDATE_RE.match(cmd):
+                continue
+            match = APT_INSTALL_RE.match(cmd)
+            if match:
+                apt_packages.update(match.group(2).split())
+            elif cmd not in seen:
                 commands.append(cmd)
                 seen.add(cmd)
 
 with open(SCRIPT_PATH, "w") as f:
     f.write("#!/bin/bash\nset -e\n\n")
+    # One apt run for every plugin, ahead of the commands that may need it.
+    if apt_packages:
+        packages = " ".join(sorted(apt_packages))
+        f.write(f"echo '🔧 Installing apt packages: {packages}'\n")
+        f.write(f"apt-get update && apt-get install -y {packages}\n")
     for cmd in commands:
         f.write(f"echo '🔧 Installing: {cmd}'\n")
         f.write(cmd + "\n")
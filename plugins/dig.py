@@ -2,8 +2,23 @@ import ipaddress
 import json
 import os
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import orjson
+
+    def _json_dump_pretty(value):
+        return orjson.dumps(
+            value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+
+except ImportError:
+
+    def _json_dump_pretty(value):
+        return json.dumps(value, indent=2, ensure_ascii=False).encode()
+
 CONFIG_PATH = "/config/config.json"
 
 with open(CONFIG_PATH) as f:
@@ -37,10 +52,11 @@ def scan_with_dig():
             break
 
     output_path = "/results/dig.json"
-    entries = []
     base_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     def run_and_parse(cmd, section):
+        entries = []
+        append = entries.append
         try:
             result = subprocess.run(cmd, capture_output=True, text=True, check=True)
             lines = result.stdout.strip().split("\n")
@@ -59,13 +75,10 @@ def scan_with_dig():
                 elif line.startswith(";") or not line.strip():
                     continue
 
-                parts = line.split()
-                if len(parts) >= 5:
-                    name = parts[0]
-                    ttl = parts[1]
-                    rtype = parts[3]
-                    data = " ".join(parts[4:])
-                    entries.append(
+                parts = line.rstrip().split(None, 4)
+                if len(parts) == 5:
+                    name, ttl, _cls, rtype, data = parts
+                    append(
                         {
                             "target": TARGET,
                             "module": "dig",
@@ -80,24 +93,28 @@ def scan_with_dig():
                     )
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"dig execution error: {e.stderr.strip()}")
+        return entries
 
     cmd = ["dig"]
     if is_ip(TARGET):
         cmd += ["-x", TARGET]
     else:
         cmd += args.split() + [TARGET]
-    run_and_parse(cmd, "answer")
+    queries = [(cmd, "answer")]
 
     if level in ["middle", "hard", "extreme"] and not is_ip(TARGET):
-        additional_queries = [
-            ["dig", "+dnssec", TARGET],
-            ["dig", "+trace", TARGET],
-            ["dig", "TXT", TARGET],
-            ["dig", f"_dmarc.{TARGET}", "TXT"],
-            ["dig", f"default._domainkey.{TARGET}", "TXT"],
+        queries += [
+            (["dig", "+dnssec", TARGET], "extra"),
+            (["dig", "+trace", TARGET], "extra"),
+            (["dig", "TXT", TARGET], "extra"),
+            (["dig", f"_dmarc.{TARGET}", "TXT"], "extra"),
+            (["dig", f"default._domainkey.{TARGET}", "TXT"], "extra"),
         ]
-        for query in additional_queries:
-            run_and_parse(query, "extra")
+
+    # The queries are independent; run them concurrently and keep their order.
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = list(pool.map(lambda q: run_and_parse(*q), queries))
+    entries = [entry for result in results for entry in result]
 
     with open(output_path, "w") as f:
         json.dump(entries, f, indent=2)
@@ -145,4 +162,4 @@ def get_summary(data):
 if __name__ == "__main__":
     json_file = scan_with_dig()
     parsed = parse(json_file)
-    print(json.dumps(parsed, indent=2, ensure_ascii=False))
+    sys.stdout.buffer.write(_json_dump_pretty(parsed) + b"\n")
@@ -3,11 +3,11 @@ import json
 import logging
 import os
 import re
-import subprocess
+import sys
 import tempfile
 from shutil import which
 
-import psycopg2
+from core.config import get_config
 from core.logger_plugin import setup_plugin_logger
 from core.registry import get_targets
 
@@ -15,9 +15,27 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
 NIKTO_LEVELS_PATH = os.path.join(ROOT_DIR, "config", "plugins", "nikto.json")
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dump_pretty(value):
+        return orjson.dumps(
+            value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dump_pretty(value):
+        return json.dumps(value, indent=2, ensure_ascii=False).encode()
+
 container_log = logging.getLogger()
 plugin_log = setup_plugin_logger("nikto")
 
+INVALID_ESCAPE_RE = re.compile(r"\\(?![\"\\/bfnrtu])")
+
 
 def is_installed() -> bool:
     return which("nikto") is not None and os.path.exists("/opt/nikto/program")
@@ -25,14 +43,15 @@ def is_installed() -> bool:
 
 def fix_invalid_json_escapes(s):
     try:
-        s = re.sub(r"\\(?![\"\\/bfnrtu])", r"\\\\", s)
+        if "\\" in s:
+            s = INVALID_ESCAPE_RE.sub(r"\\\\", s)
         s = s.replace("\r", "\\r").replace("\n", "\\n")
         return s
     except Exception as e:
         raise RuntimeError(f"Error while fixing JSON escape sequences: {e}")
 
 
-def run_nikto(target: str, suffix: str, args: str):
+async def run_nikto(target: str, suffix: str, args: str):
     temp_file = tempfile.NamedTemporaryFile(
         delete=False, suffix=f"_{suffix}_nikto.json"
     )
@@ -48,35 +67,47 @@ def run_nikto(target: str, suffix: str, args: str):
     )
     container_log.info(f"Running Nikto on {target}: {' '.join(cmd)}")
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    stderr = stderr.decode(errors="replace").strip()
 
-    log_parts = [f"Running Nikto on {target}: {' '.join(cmd)}"]
-    if result.stdout.strip():
-        log_parts.append(result.stdout.strip())
-    if result.stderr.strip():
-        log_parts.append(f"[STDERR]:\n{result.stderr.strip()}")
-    plugin_log.info("\n".join(log_parts))
+    if plugin_log.isEnabledFor(logging.INFO):
+        log_parts = [f"Running Nikto on {target}: {' '.join(cmd)}"]
+        stdout = stdout.decode(errors="replace").strip()
+        if stdout:
+            log_parts.append(stdout)
+        if stderr:
+            log_parts.append(f"[STDERR]:\n{stderr}")
+        plugin_log.info("\n".join(log_parts))
 
-    if result.returncode != 0:
-        raise RuntimeError(f"Nikto exited with error: {result.stderr.strip()}")
+    if proc.returncode != 0:
+        raise RuntimeError(f"Nikto exited with error: {stderr}")
 
     if not os.path.exists(output_path):
         raise RuntimeError("Nikto did not produce a JSON file")
 
     with open(output_path, "r", encoding="utf-8") as f:
-        content = f.read().strip()
+        raw = f.read()
+    content = raw.strip()
 
     if not content:
         raise RuntimeError("Nikto JSON file is empty (0 bytes)")
 
     try:
-        content = fix_invalid_json_escapes(content)
-        data = json.loads(content)
+        fixed = fix_invalid_json_escapes(content)
+        data = _json_loads(fixed)
         if not data:
             container_log.warning("Nikto finished with no vulnerabilities — JSON is an empty list.")
     except json.JSONDecodeError:
         raise RuntimeError("Nikto returned invalid JSON")
 
+    if fixed != content:
+        # Keep the repaired JSON so parse() can load it as-is.
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(fixed)
+
     return output_path
 
 
@@ -84,8 +115,11 @@ def parse(json_path: str, source_label: str = "unknown", port="-"):
     try:
         with open(json_path, "r", encoding="utf-8") as f:
             raw = f.read()
-            raw = fix_invalid_json_escapes(raw)
-            data = json.loads(raw)
+        try:
+            data = _json_loads(raw)
+        except json.JSONDecodeError:
+            # Not written by run_nikto(), so the escapes were never repaired.
+            data = _json_loads(fix_invalid_json_escapes(raw.strip()))
 
         if not data or not isinstance(data, list):
             return []
@@ -111,68 +145,6 @@ def parse(json_path: str, source_label: str = "unknown", port="-"):
         raise RuntimeError(f"Error while parsing Nikto JSON: {e}")
 
 
-def get_targets_from_plugins(db_config, plugin_names, target_type, target):
-    conn = psycopg2.connect(
-        database=db_config["POSTGRES_DB"],
-        user=db_config["POSTGRES_USER"],
-        password=db_config["POSTGRES_PASSWORD"],
-        host=db_config["POSTGRES_HOST"],
-        port=db_config["POSTGRES_PORT"],
-    )
-    cursor = conn.cursor()
-    found = set()
-    if not plugin_names:
-        cursor.close()
-        conn.close()
-        return []
-    placeholders = ",".join(["%s"] * len(plugin_names))
-    cursor.execute(
-        f"SELECT target, plugin, data FROM results WHERE plugin IN ({placeholders})",
-        tuple(plugin_names),
-    )
-    for row_target, plugin, data in cursor.fetchall():
-        try:
-            if isinstance(data, str):
-                data = json.loads(data)
-            if isinstance(data, dict):
-                data = [data]
-            for d in data:
-                if (
-                    d.get("state") == "open"
-                    and d.get("protocol") == "tcp"
-                    and str(d.get("port", "")) not in ["", "-", "0", "None"]
-                ):
-                    svc = d.get("service_name", "").lower()
-                    if any(
-                        x in svc
-                        for x in [
-                            "http",
-                            "https",
-                            "proxy",
-                            "ssl",
-                            "web",
-                            "jetty",
-                            "tomcat",
-                        ]
-                    ):
-                        proto = "https" if "ssl" in svc or "https" in svc else "http"
-                        if (
-                            target_type == "ip"
-                            and re.match(r"^\d{1,3}(\.\d{1,3}){3}$", row_target)
-                            and row_target == str(target)
-                        ) or (
-                            target_type == "domain"
-                            and not re.match(r"^\d{1,3}(\.\d{1,3}){3}$", row_target)
-                            and row_target == str(target)
-                        ):
-                            found.add((str(row_target), int(d["port"]), proto))
-        except Exception:
-            continue
-    cursor.close()
-    conn.close()
-    return list(found)
-
-
 def get_important_fields():
     return ["msg"]
 
@@ -229,9 +201,14 @@ async def scan(config):
     level = plugin_config.get("level", "easy")
     strict_nmap = plugin_config.get("strict_dependencies", False)
 
-    with open(NIKTO_LEVELS_PATH) as f:
-        all_levels = json.load(f)
-    level_config = all_levels["levels"].get(level, {})
+    level_config = get_config(NIKTO_LEVELS_PATH)["levels"].get(level, {})
+
+    source_prefix = ""
+    if strict_nmap:
+        depends_on = plugin_config.get("depends_on", [])
+        depends_str = "+".join(sorted(dep for dep in depends_on if dep))
+        if depends_str:
+            source_prefix = f"{depends_str}_"
 
     tasks = []
     sources = []
@@ -255,11 +232,12 @@ async def scan(config):
                 for port in conf.get("ports", []):
                     port_set.add((str(target), int(port), proto))
 
+        sorted_ports = sorted(port_set)
         container_log.info(
-            f"Nikto: Final list of targets for {target_type} {target}: {sorted(port_set)}"
+            f"Nikto: Final list of targets for {target_type} {target}: {sorted_ports}"
         )
 
-        for port_tuple in sorted(port_set):
+        for port_tuple in sorted_ports:
             tgt, port, proto = port_tuple
             conf = get_nikto_conf(level_config, target_type, proto)
             if not conf or not conf.get("enabled", False):
@@ -272,20 +250,8 @@ async def scan(config):
             key = (str(tgt), int(port), proto)
             if key in added_nikto_targets:
                 continue
-            tasks.append(asyncio.to_thread(run_nikto, tgt, suffix, args))
-
-            if strict_nmap:
-                depends_on = plugin_config.get("depends_on", [])
-                depends_str = "+".join(sorted(dep for dep in depends_on if dep))
-                source = (
-                    f"{depends_str}_{target_type}_{proto}"
-                    if depends_str
-                    else f"{target_type}_{proto}"
-                )
-            else:
-                source = f"{target_type}_{proto}"
-
-            sources.append((source, port))
+            tasks.append(run_nikto(tgt, suffix, args))
+            sources.append((f"{source_prefix}{suffix}", port))
             added_nikto_targets.add(key)
 
     results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -299,7 +265,6 @@ async def scan(config):
 
 
 if __name__ == "__main__":
-    with open(CONFIG_PATH) as f:
-        CONFIG = json.load(f)
+    CONFIG = get_config(CONFIG_PATH)
     result = asyncio.run(scan(CONFIG))
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.stdout.buffer.write(_json_dump_pretty(result) + b"\n")
@@ -2,24 +2,41 @@ import asyncio
 import json
 import logging
 import os
+import re
+import shlex
 import shutil
-import subprocess
+import sys
 import tempfile
 import xml.etree.ElementTree as ET
 from collections import Counter
 
+from core.config import get_config
 from core.logger_plugin import setup_plugin_logger
-from core.registry import add_target
+from core.registry import add_targets_bulk
 from core.severity import classify_severity
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_PATH = os.path.join(ROOT_DIR, "config", "config.json")
+NMAP_LEVELS_PATH = os.path.join(ROOT_DIR, "config", "plugins", "nmap.json")
+
+try:
+    import orjson
+
+    def _json_dump_pretty(value):
+        return orjson.dumps(
+            value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+
+except ImportError:
+
+    def _json_dump_pretty(value):
+        return json.dumps(value, indent=2, ensure_ascii=False).encode()
 
 container_log = logging.getLogger()
 plugin_log = setup_plugin_logger("nmap")
 
 
-def run_nmap(target: str, suffix: str, args: str):
+async def run_nmap(target: str, suffix: str, args: str):
     container_log = logging.getLogger()
     from core.logger_plugin import setup_plugin_logger
 
@@ -30,20 +47,28 @@ def run_nmap(target: str, suffix: str, args: str):
     temp_file.close()
 
     container_log.info(f"Created temporary file for Nmap: {output_path}")
-    cmd = f"nmap {args} {target} -oX {output_path}"
+    # Split args and target the way the shell used to; no /bin/sh in between.
+    cmd_list = ["nmap", *shlex.split(args), *shlex.split(target), "-oX", output_path]
+    cmd = shlex.join(cmd_list)
     container_log.info(f"Running Nmap on {target}: {cmd}")
 
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    proc = await asyncio.create_subprocess_exec(
+        *cmd_list, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await proc.communicate()
+    stderr = stderr.decode(errors="replace").strip()
 
-    full_log = f"Running Nmap on {target}: {cmd}\n"
-    if result.stdout:
-        full_log += result.stdout.strip()
-    if result.stderr:
-        full_log += f"\n[STDERR]:\n{result.stderr.strip()}"
-    plugin_log.info(full_log)
+    # nmap's stdout can run to megabytes; only decode it when it gets logged.
+    if plugin_log.isEnabledFor(logging.INFO):
+        full_log = f"Running Nmap on {target}: {cmd}\n"
+        if stdout:
+            full_log += stdout.decode(errors="replace").strip()
+        if stderr:
+            full_log += f"\n[STDERR]:\n{stderr}"
+        plugin_log.info(full_log)
 
-    if result.returncode != 0:
-        raise RuntimeError(f"Nmap exited with error: {result.stderr.strip()}")
+    if proc.returncode != 0:
+        raise RuntimeError(f"Nmap exited with error: {stderr}")
 
     reports_tmp = "/reports/tmp"
     os.makedirs(reports_tmp, exist_ok=True)
@@ -55,73 +80,79 @@ def run_nmap(target: str, suffix: str, args: str):
     return new_path
 
 
+CVE_RE = re.compile(r"CVE-\d{4}-\d{4,}")
+
+CERT_KEYS = (
+    "Subject:",
+    "Subject Alternative Name",
+    "Issuer:",
+    "Public Key",
+    "Signature Algorithm",
+    "Not valid",
+    "MD5:",
+    "SHA-1:",
+)
+
+
 def format_script_output(raw: str) -> str:
     raw = raw.strip()
     if raw == "-" or not raw:
         return "-"
-    lines = [
-        line.strip()
-        for line in raw.splitlines()
-        if line.strip() and line.strip() != "-"
-    ]
-    unique_lines = list(dict.fromkeys(lines))
-    sections = []
 
-    if any("TLSv1." in l or "TLSv1.3" in l for l in unique_lines):
-        tls_lines = []
-        current_version = ""
-        for line in unique_lines:
-            if "TLSv1." in line or "TLSv1.3" in line:
-                current_version = line.strip().strip(":")
-                tls_lines.append(f"\n{current_version}")
-            elif "TLS_" in line or "TLS_AKE_" in line:
-                tls_lines.append(f"- {line.strip()}")
-        if tls_lines:
-            sections.append("[TLS Cipher Support]\n" + "\n".join(tls_lines))
-    if any("Subject:" in l or "Valid:" in l for l in unique_lines):
+    # One pass over the deduplicated lines fills every section's bucket.
+    unique_lines = []
+    seen = set()
+    has_tls = has_cert = has_http = False
+    tls_lines = []
+    cert_lines = {key: [] for key in CERT_KEYS}
+    ftp_lines = []
+    ssh_lines = []
+    http_lines = []
+    vuln_lines = []
+    for line in raw.splitlines():
+        line = line.strip()
+        if not line or line == "-" or line in seen:
+            continue
+        seen.add(line)
+        unique_lines.append(line)
+
+        if "TLSv1." in line:
+            has_tls = True
+            tls_lines.append(f"\n{line.strip(':')}")
+        elif "TLS_" in line:
+            tls_lines.append(f"- {line}")
+        if "Subject:" in line or "Valid:" in line:
+            has_cert = True
+        for key, bucket in cert_lines.items():
+            if key in line:
+                bucket.append(line)
+        if "FTP" in line:
+            ftp_lines.append(line)
+        if "SSH" in line:
+            ssh_lines.append(line)
+        if "/nice ports" in line or "FourOhFourRequest" in line:
+            has_http = True
+        if "Request" in line or "OPTIONS" in line:
+            http_lines.append(f"- {line}")
+        if "CVE-" in line or "vulnerab" in line.lower():
+            vuln_lines.append(line)
+
+    sections = []
+    if has_tls:
+        sections.append("[TLS Cipher Support]\n" + "\n".join(tls_lines))
+    if has_cert:
         cert_block = ["[Cert Info]"]
-        for key in [
-            "Subject:",
-            "Subject Alternative Name",
-            "Issuer:",
-            "Public Key",
-            "Signature Algorithm",
-            "Not valid",
-            "MD5:",
-            "SHA-1:",
-        ]:
-            cert_block.extend([line for line in unique_lines if key in line])
+        for bucket in cert_lines.values():
+            cert_block.extend(bucket)
         sections.append("\n".join(cert_block))
-    if any("FTP" in l or "Anonymous FTP login allowed" in l for l in unique_lines):
-        ftp_block = ["[FTP Info]"]
-        ftp_block.extend([line for line in unique_lines if "FTP" in line])
-        sections.append("\n".join(ftp_block))
-    if any("SSH" in l for l in unique_lines):
-        ssh_block = ["[SSH Info]"]
-        ssh_block.extend([line for line in unique_lines if "SSH" in line])
-        sections.append("\n".join(ssh_block))
-    if any("/nice ports" in l or "FourOhFourRequest" in l for l in unique_lines):
-        http_block = ["[HTTP Response Patterns]"]
-        http_block.extend(
-            [
-                f"- {line}"
-                for line in unique_lines
-                if any(k in line for k in ["FourOhFourRequest", "Request", "OPTIONS"])
-            ]
-        )
-        sections.append("\n".join(http_block))
-    if any("CVE-" in l or "vulnerab" in l.lower() for l in unique_lines):
-        vuln_lines = [
-            line
-            for line in unique_lines
-            if "CVE-" in line or "vulnerab" in line.lower()
-        ]
-        cves = [
-            word
-            for line in vuln_lines
-            for word in line.split()
-            if word.startswith("CVE-")
-        ]
+    if ftp_lines:
+        sections.append("\n".join(["[FTP Info]"] + ftp_lines))
+    if ssh_lines:
+        sections.append("\n".join(["[SSH Info]"] + ssh_lines))
+    if has_http:
+        sections.append("\n".join(["[HTTP Response Patterns]"] + http_lines))
+    if vuln_lines:
+        cves = CVE_RE.findall("\n".join(vuln_lines))
         cve_counter = Counter(cves)
         counted_cves = sorted(
             [
@@ -134,98 +165,104 @@ def format_script_output(raw: str) -> str:
     return "\n\n".join(sections).strip() if sections else "\n".join(unique_lines)
 
 
+def parse_port(port):
+    state_el = port.find("state")
+    service_el = port.find("service")
+    raw_output = (
+        "; ".join(s.attrib.get("output", "") for s in port.findall("script")) or "-"
+    )
+    return {
+        "port": int(port.attrib.get("portid", 0)),
+        "protocol": port.attrib.get("protocol", "-"),
+        "state": (state_el.attrib.get("state", "-") if state_el is not None else "-"),
+        "reason": (
+            state_el.attrib.get("reason", "-") if state_el is not None else "-"
+        ),
+        "service_name": (
+            service_el.attrib.get("name", "-") if service_el is not None else "-"
+        ),
+        "product": (
+            service_el.attrib.get("product", "-") if service_el is not None else "-"
+        ),
+        "version": (
+            service_el.attrib.get("version", "-") if service_el is not None else "-"
+        ),
+        "extra": (
+            service_el.attrib.get("extrainfo", "-") if service_el is not None else "-"
+        ),
+        "cpe": (
+            service_el.findtext("cpe", default="-") if service_el is not None else "-"
+        ),
+        "script_output": format_script_output(raw_output),
+    }
+
+
 def parse(xml_path: str, source_label: str = "unknown"):
     results = []
     try:
-        tree = ET.parse(xml_path)
-        root = tree.getroot()
-        host = root.find("host")
-        ports = host.find("ports") if host is not None else None
-
+        # Stream the XML: only the first <host> is reported, and nmap writes
+        # <os> after <ports>, so port fields are collected first and the host
+        # fields are filled in once the host element closes.
+        host = None
+        ports = None
+        port_fields = []
         ip = None
         fqdn = None
         os_name = None
-        for addr in host.findall("address") if host is not None else []:
-            if addr.attrib.get("addrtype") == "ipv4":
-                ip = addr.attrib.get("addr")
-        for hostnames in host.findall("hostnames") if host is not None else []:
-            hn = hostnames.find("hostname")
-            if hn is not None:
-                fqdn = hn.attrib.get("name")
-        for os_el in host.findall("os") if host is not None else []:
-            match = os_el.find("osmatch")
-            if match is not None:
-                os_name = match.attrib.get("name")
-
-        if ports is not None:
-            for port in ports.findall("port"):
-                state_el = port.find("state")
-                service_el = port.find("service")
-                raw_output = (
-                    "; ".join(
-                        s.attrib.get("output", "") for s in port.findall("script")
-                    )
-                    or "-"
-                )
-                data = {
-                    "ip": ip,
-                    "fqdn": fqdn,
-                    "os": os_name,
-                    "port": int(port.attrib.get("portid", 0)),
-                    "protocol": port.attrib.get("protocol", "-"),
-                    "state": (
-                        state_el.attrib.get("state", "-")
-                        if state_el is not None
-                        else "-"
-                    ),
-                    "reason": (
-                        state_el.attrib.get("reason", "-")
-                        if state_el is not None
-                        else "-"
-                    ),
-                    "service_name": (
-                        service_el.attrib.get("name", "-")
-                        if service_el is not None
-                        else "-"
-                    ),
-                    "product": (
-                        service_el.attrib.get("product", "-")
-                        if service_el is not None
-                        else "-"
-                    ),
-                    "version": (
-                        service_el.attrib.get("version", "-")
-                        if service_el is not None
-                        else "-"
-                    ),
-                    "extra": (
-                        service_el.attrib.get("extrainfo", "-")
-                        if service_el is not None
-                        else "-"
-                    ),
-                    "cpe": (
-                        service_el.findtext("cpe", default="-")
-                        if service_el is not None
-                        else "-"
-                    ),
-                    "script_output": format_script_output(raw_output),
-                    "source": source_label,
-                    "evidence_path": xml_path,
-                    "evidence_type": source_label,
-                }
-                data["severity"] = classify_severity(data)
-                data["host_meta"] = {"os": os_name}
-                data["service_meta"] = {"cpe": data["cpe"], "extra": data["extra"]}
-                data["vuln_meta"] = {
-                    "state": data["state"],
-                    "reason": data["reason"],
-                    "product": data["product"],
-                    "version": data["version"],
-                    "extra": data["extra"],
-                    "cpe": data["cpe"],
-                    "script_output": data["script_output"],
-                }
-                results.append(data)
+        stack = []
+        for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+            if event == "start":
+                if host is None and len(stack) == 1 and elem.tag == "host":
+                    host = elem
+                elif ports is None and host is not None and stack[-1] is host:
+                    if elem.tag == "ports":
+                        ports = elem
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            if elem is host:
+                break
+            parent = stack[-1] if stack else None
+            if host is not None and parent is host:
+                if elem.tag == "address":
+                    if elem.attrib.get("addrtype") == "ipv4":
+                        ip = elem.attrib.get("addr")
+                elif elem.tag == "hostnames":
+                    hn = elem.find("hostname")
+                    if hn is not None:
+                        fqdn = hn.attrib.get("name")
+                elif elem.tag == "os":
+                    match = elem.find("osmatch")
+                    if match is not None:
+                        os_name = match.attrib.get("name")
+            elif ports is not None and parent is ports and elem.tag == "port":
+                port_fields.append(parse_port(elem))
+                elem.clear()
+
+        for fields in port_fields:
+            data = {
+                "ip": ip,
+                "fqdn": fqdn,
+                "os": os_name,
+                **fields,
+                "source": source_label,
+                "evidence_path": xml_path,
+                "evidence_type": source_label,
+            }
+            data["severity"] = classify_severity(data)
+            data["host_meta"] = {"os": os_name}
+            data["service_meta"] = {"cpe": data["cpe"], "extra": data["extra"]}
+            data["vuln_meta"] = {
+                "state": data["state"],
+                "reason": data["reason"],
+                "product": data["product"],
+                "version": data["version"],
+                "extra": data["extra"],
+                "cpe": data["cpe"],
+                "script_output": data["script_output"],
+            }
+            results.append(data)
     except Exception as e:
         raise RuntimeError(f"Error while parsing XML file {xml_path}: {e}")
     return results
@@ -250,36 +287,32 @@ def merge_sources(a, b):
     return "+".join(sorted(set(a.split("+")) | set(b.split("+"))))
 
 
+BLANK_VALUES = frozenset(("-", "", "None", "null"))
+
+
+def entry_signature(entry, fields):
+    """Stripped field values with every blank placeholder folded to ""."""
+    sig = []
+    for k in fields:
+        value = str(entry.get(k, "-")).strip()
+        sig.append("" if value in BLANK_VALUES else value)
+    return tuple(sig)
+
+
 def merge_entries(*entry_lists):
+    # key -> [entry, signature of its important fields]
     merged = {}
     important_fields = get_important_fields()
 
-    def is_empty(entry):
-        return all(
-            str(entry.get(k, "-")).strip() in ["-", "", "null", "None", "0"]
-            for k in important_fields
-        )
-
     for entries in entry_lists:
-        for entry in [e for e in entries if not is_empty(e)]:
+        for entry in entries:
+            sig = entry_signature(entry, important_fields)
+            if all(v in ("", "0") for v in sig):
+                continue
             key = (entry.get("port"), entry.get("protocol"), entry.get("service_name"))
             if key in merged:
-                existing = merged[key]
-                identical = True
-                for k in important_fields:
-                    v1 = str(entry.get(k, "-")).strip()
-                    v2 = str(existing.get(k, "-")).strip()
-                    if v1 in ["-", "", "None", "null"] and v2 in [
-                        "-",
-                        "",
-                        "None",
-                        "null",
-                    ]:
-                        continue
-                    if v1 != v2:
-                        identical = False
-                        break
-                if identical:
+                existing, existing_sig = merged[key]
+                if sig == existing_sig:
                     existing["source"] = merge_sources(
                         existing["source"], entry["source"]
                     )
@@ -289,12 +322,15 @@ def merge_entries(*entry_lists):
                                 set([existing["script_output"], entry["script_output"]])
                             )
                             existing["script_output"] = format_script_output(combined)
+                            merged[key][1] = entry_signature(
+                                existing, important_fields
+                            )
                 else:
                     new_key = key + (entry["source"],)
-                    merged[new_key] = entry
+                    merged[new_key] = [entry, sig]
             else:
-                merged[key] = entry
-    return list(merged.values())
+                merged[key] = [entry, sig]
+    return [entry for entry, _ in merged.values()]
 
 
 def normalize_ports(port_list):
@@ -312,109 +348,60 @@ def normalize_ports(port_list):
     return ",".join(normalized)
 
 
+def build_scan_args(proto_conf):
+    ports = proto_conf.get("ports", [])
+    ports_str = f"-p {normalize_ports(ports)}" if ports else ""
+    script_names = []
+    script_args = []
+    for s in proto_conf.get("scripts", []):
+        if isinstance(s, str):
+            script_names.append(s)
+        elif isinstance(s, dict) and "name" in s:
+            script_names.append(s["name"])
+            if "args" in s and s["args"]:
+                script_args.append(s["args"].replace('"', "'"))
+    parts = [
+        proto_conf["flags"],
+        ports_str,
+        f"--script {','.join(script_names)}" if script_names else "",
+        f"--script-args {','.join(script_args)}" if script_args else "",
+    ]
+    return " ".join(part for part in parts if part).strip()
+
+
+def build_scan_tasks(target_type, target, level_config):
+    tasks = []
+    sources = []
+    for proto, proto_conf in level_config.get(target_type, {}).items():
+        if not proto_conf.get("enabled", True) or not proto_conf.get("flags"):
+            continue
+        source = f"{target_type}_{proto}"
+        tasks.append(run_nmap(target, source, build_scan_args(proto_conf)))
+        sources.append(source)
+    return tasks, sources
+
+
 async def scan(config):
     ip = config.get("scan_config", {}).get("target_ip")
     domain = config.get("scan_config", {}).get("target_domain")
+    network = config.get("scan_config", {}).get("target_network")
     plugin_config = next(
         (p for p in config.get("plugins", []) if p["name"] == "nmap"), {}
     )
     level = plugin_config.get("level", "easy")
-    NMAP_LEVELS_PATH = os.path.join(ROOT_DIR, "config", "plugins", "nmap.json")
-    with open(NMAP_LEVELS_PATH) as f:
-        NMAP_LEVELS = json.load(f)["levels"]
-    level_config = NMAP_LEVELS.get(level, {})
+    level_config = get_config(NMAP_LEVELS_PATH)["levels"].get(level, {})
 
     tasks = []
     sources = []
-
-    if ip:
-        for proto, proto_conf in level_config.get("ip", {}).items():
-            if not proto_conf.get("enabled", True):
-                continue
-            if proto_conf.get("flags"):
-                ports = proto_conf.get("ports", [])
-                ports_str = f"-p {normalize_ports(ports)}" if ports else ""
-                scripts = proto_conf.get("scripts", [])
-                script_names = []
-                script_args = []
-                for s in scripts:
-                    if isinstance(s, str):
-                        script_names.append(s)
-                    elif isinstance(s, dict) and "name" in s:
-                        script_names.append(s["name"])
-                        if "args" in s and s["args"]:
-                            script_args.append(s["args"].replace('"', "'"))
-                parts = [
-                    proto_conf["flags"],
-                    ports_str,
-                    f"--script {','.join(script_names)}" if script_names else "",
-                    f"--script-args {','.join(script_args)}" if script_args else "",
-                ]
-                full_args = " ".join(part for part in parts if part).strip()
-                tasks.append(asyncio.to_thread(run_nmap, ip, f"ip_{proto}", full_args))
-                sources.append(f"ip_{proto}")
-
-    if domain:
-        for proto, proto_conf in level_config.get("domain", {}).items():
-            if not proto_conf.get("enabled", True):
-                continue
-            if proto_conf.get("flags"):
-                ports = proto_conf.get("ports", [])
-                ports_str = f"-p {normalize_ports(ports)}" if ports else ""
-                scripts = proto_conf.get("scripts", [])
-                script_names = []
-                script_args = []
-                for s in scripts:
-                    if isinstance(s, str):
-                        script_names.append(s)
-                    elif isinstance(s, dict) and "name" in s:
-                        script_names.append(s["name"])
-                        if "args" in s and s["args"]:
-                            script_args.append(s["args"].replace('"', "'"))
-                parts = [
-                    proto_conf["flags"],
-                    ports_str,
-                    f"--script {','.join(script_names)}" if script_names else "",
-                    f"--script-args {','.join(script_args)}" if script_args else "",
-                ]
-                full_args = " ".join(part for part in parts if part).strip()
-                tasks.append(
-                    asyncio.to_thread(run_nmap, domain, f"domain_{proto}", full_args)
-                )
-                sources.append(f"domain_{proto}")
-
-    network = config.get("scan_config", {}).get("target_network")
-    if network:
-        for proto, proto_conf in level_config.get("network", {}).items():
-            if not proto_conf.get("enabled", True):
-                continue
-            if proto_conf.get("flags"):
-                ports = proto_conf.get("ports", [])
-                ports_str = f"-p {normalize_ports(ports)}" if ports else ""
-                scripts = proto_conf.get("scripts", [])
-                script_names = []
-                script_args = []
-                for s in scripts:
-                    if isinstance(s, str):
-                        script_names.append(s)
-                    elif isinstance(s, dict) and "name" in s:
-                        script_names.append(s["name"])
-                        if "args" in s and s["args"]:
-                            script_args.append(s["args"].replace('"', "'"))
-                parts = [
-                    proto_conf["flags"],
-                    ports_str,
-                    f"--script {','.join(script_names)}" if script_names else "",
-                    f"--script-args {','.join(script_args)}" if script_args else "",
-                ]
-                full_args = " ".join(part for part in parts if part).strip()
-                tasks.append(
-                    asyncio.to_thread(run_nmap, network, f"network_{proto}", full_args)
-                )
-                sources.append(f"network_{proto}")
+    for target_type, target in (("ip", ip), ("domain", domain), ("network", network)):
+        if target:
+            new_tasks, new_sources = build_scan_tasks(target_type, target, level_config)
+            tasks += new_tasks
+            sources += new_sources
 
     results = await asyncio.gather(*tasks)
 
+    web_targets = []
     for path, src in zip(results, sources):
         entries = parse(path, src)
         for ent in entries:
@@ -423,19 +410,23 @@ async def scan(config):
                 and ent.get("protocol") == "tcp"
                 and ent.get("service_name", "").lower() in ["http", "https"]
             ):
-                add_target(
-                    target_type="ip" if "ip" in src else "domain",
-                    target_value=(
-                        config.get("scan_config", {}).get("target_ip")
-                        if "ip" in src
-                        else config.get("scan_config", {}).get("target_domain")
-                    ),
-                    port=ent.get("port"),
-                    protocol=ent.get("protocol"),
-                    source_plugin="nmap",
-                    tags=["web"],
-                    meta={"service": ent.get("service_name")},
+                web_targets.append(
+                    {
+                        "target_type": "ip" if "ip" in src else "domain",
+                        "target_value": (
+                            config.get("scan_config", {}).get("target_ip")
+                            if "ip" in src
+                            else config.get("scan_config", {}).get("target_domain")
+                        ),
+                        "port": ent.get("port"),
+                        "protocol": ent.get("protocol"),
+                        "source_plugin": "nmap",
+                        "tags": ["web"],
+                        "meta": {"service": ent.get("service_name")},
+                    }
                 )
+    if web_targets:
+        add_targets_bulk(web_targets)
 
     return [
         {"plugin": "nmap", "path": path, "source": src}
@@ -537,7 +528,6 @@ def postprocess_result(entry):
 
 
 if __name__ == "__main__":
-    with open(CONFIG_PATH) as f:
-        CONFIG = json.load(f)
+    CONFIG = get_config(CONFIG_PATH)
     result = asyncio.run(scan(CONFIG))
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.stdout.buffer.write(_json_dump_pretty(result) + b"\n")
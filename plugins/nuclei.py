@@ -1,58 +1,92 @@
 import json
 import os
 import subprocess
+import sys
 from datetime import datetime
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dump_pretty(value):
+        return orjson.dumps(
+            value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dump_pretty(value):
+        return json.dumps(value, indent=2, ensure_ascii=False).encode()
+
 CONFIG_PATH = "/config/config.json"
 
-with open(CONFIG_PATH) as f:
-    CONFIG = json.load(f)
+with open(CONFIG_PATH, "rb") as f:
+    CONFIG = _json_loads(f.read())
 
 TARGET = CONFIG["scan_config"].get("target_domain")
-if not TARGET:
-    raise ValueError("nuclei requires target_domain, but it is not set in the config.")
 
 
 def scan_with_nuclei():
+    if not TARGET:
+        raise ValueError("nuclei requires target_domain, but it is not set in the config.")
     output_path = "/results/nuclei.json"
-    cmd = f"nuclei -u http://{TARGET} -jsonl -t /root/nuclei-templates -o {output_path}"
+    cmd = [
+        "nuclei",
+        "-u",
+        f"http://{TARGET}",
+        "-jsonl",
+        "-t",
+        "/root/nuclei-templates",
+        "-o",
+        output_path,
+    ]
 
-    process = subprocess.Popen(
-        cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-    )
-    stdout, stderr = process.communicate()
+    # Findings go to output_path, so stdout is never read.
+    process = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
 
     if process.returncode != 0:
-        raise RuntimeError(f"nuclei exited with error: {stderr.decode().strip()}")
+        raise RuntimeError(f"nuclei exited with error: {process.stderr.decode().strip()}")
 
     return output_path
 
 
+def project_entry(entry, dedupe):
+    get = entry.get
+    info_get = (get("info") or {}).get
+    return {
+        "templateID": get("templateID", "-"),
+        "info.name": info_get("name", "-"),
+        "info.severity": dedupe(info_get("severity", "-")),
+        "matched-at": get("matched-at", "-"),
+        "type": dedupe(get("type", "-")),
+        "host": dedupe(get("host", "-")),
+    }
+
+
 def parse(json_path):
     results = []
 
-    if not os.path.exists(json_path):
+    try:
+        size = os.stat(json_path).st_size
+    except FileNotFoundError:
         raise FileNotFoundError(f"File {json_path} not found")
 
-    if os.path.getsize(json_path) == 0:
+    if size == 0:
         return []
 
-    try:
-        with open(json_path, "r") as f:
-            entries = [json.loads(line) for line in f if line.strip()]
+    # Severity, type and host repeat across rows; keep one str per value.
+    shared = {}
 
-        parsed_entries = []
-        for entry in entries:
-            parsed_entries.append(
-                {
-                    "templateID": entry.get("templateID", "-"),
-                    "info.name": entry.get("info", {}).get("name", "-"),
-                    "info.severity": entry.get("info", {}).get("severity", "-"),
-                    "matched-at": entry.get("matched-at", "-"),
-                    "type": entry.get("type", "-"),
-                    "host": entry.get("host", "-"),
-                }
-            )
+    def dedupe(value):
+        return shared.setdefault(value, value)
+
+    try:
+        with open(json_path, "rb", buffering=1024 * 1024) as f:
+            parsed_entries = [
+                project_entry(_json_loads(line), dedupe) for line in f if line.strip()
+            ]
 
         if parsed_entries:
             results.append(
@@ -61,7 +95,7 @@ def parse(json_path):
                     "module": "nuclei",
                     "severity": "high",
                     "data": parsed_entries,
-                    "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "created_at": datetime.now().isoformat(sep=" ", timespec="seconds"),
                 }
             )
 
@@ -93,4 +127,4 @@ def get_column_order():
 if __name__ == "__main__":
     json_file = scan_with_nuclei()
     parsed = parse(json_file)
-    print(json.dumps(parsed, indent=2, ensure_ascii=False))
+    sys.stdout.buffer.write(_json_dump_pretty(parsed) + b"\n")
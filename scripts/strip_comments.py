@@ -11,74 +11,94 @@ Rules:
 
 This script edits files in-place and prints a summary.
 """
+import os
 import pathlib
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
-patterns = [
-    "**/*.py",
-    "docker/**/Dockerfile*",
-    "db/**/Dockerfile",
-    "**/Dockerfile*",
-    "**/*.sql",
-    "**/*.yaml",
-    "**/*.yml",
-    "**/*.sh",
-]
-
-SKIP_DIRS = ["templates", "reports", ".git"]
-
-modified = []
-
-for pat in patterns:
-    for p in ROOT.glob(pat):
-        if any(part in SKIP_DIRS for part in p.parts):
-            continue
-        if p.is_file():
-            try:
-                text = p.read_text(encoding="utf-8")
-            except Exception:
-                try:
-                    text = p.read_text(encoding="latin-1")
-                except Exception:
-                    print(f"Skipping binary/unreadable: {p}")
-                    continue
-
-            lines = text.splitlines()
-            new_lines = []
-            changed = False
-            suffix = p.suffix.lower()
-            name = p.name
-            for i, line in enumerate(lines):
-                stripped = line.lstrip()
-                if i == 0 and stripped.startswith("#!"):
-                    new_lines.append(line)
-                    continue
-                if suffix == ".py":
-                    if stripped.startswith("#"):
-                        changed = True
-                        continue
-                elif suffix in {".yaml", ".yml"}:
-                    if stripped.startswith("#"):
-                        changed = True
-                        continue
-                elif suffix == ".sql":
-                    if stripped.startswith("--"):
-                        changed = True
-                        continue
-                elif suffix == ".sh":
-                    if stripped.startswith("#"):
-                        changed = True
-                        continue
-                else:
-                    if name.startswith("Dockerfile") or "docker" in p.parts:
-                        if stripped.startswith("#"):
-                            changed = True
-                            continue
-                new_lines.append(line)
-            if changed:
-                p.write_text("\n".join(new_lines) + ("\n" if text.endswith("\n") else ""), encoding="utf-8")
-                modified.append(str(p.relative_to(ROOT)))
+
+SKIP_DIRS = {"templates", "reports", ".git"}
+PARALLEL_MIN_FILES = 50
+
+# Whole comment lines, including their newline; [^\S\n]* is in-line whitespace.
+HASH_COMMENT_RE = re.compile(rb"^[^\S\n]*#.*(?:\n|\Z)", re.M)
+SQL_COMMENT_RE = re.compile(rb"^[^\S\n]*--.*(?:\n|\Z)", re.M)
+SHEBANG_RE = re.compile(rb"[^\S\n]*#!")
+
+# (pattern, marker): files whose bytes lack the marker cannot match the pattern.
+HASH_COMMENTS = (HASH_COMMENT_RE, b"#")
+SQL_COMMENTS = (SQL_COMMENT_RE, b"--")
+
+COMMENT_PATTERNS = {
+    ".py": HASH_COMMENTS,
+    ".yaml": HASH_COMMENTS,
+    ".yml": HASH_COMMENTS,
+    ".sh": HASH_COMMENTS,
+    ".sql": SQL_COMMENTS,
+}
+
+
+def comment_pattern(name):
+    kind = COMMENT_PATTERNS.get(os.path.splitext(name)[1].lower())
+    if kind is None and name.startswith("Dockerfile"):
+        return HASH_COMMENTS
+    return kind
+
+
+def strip_comments(raw, pattern):
+    """Return (new_raw, removed_count); a leading shebang line is kept."""
+    head, body = b"", raw
+    if SHEBANG_RE.match(raw):
+        first_end = raw.find(b"\n") + 1 or len(raw)
+        head, body = raw[:first_end], raw[first_end:]
+    body, count = pattern.subn(b"", body)
+    new_raw = head + body
+    # Keep the file's trailing-newline state exactly as it was.
+    if raw.endswith(b"\n"):
+        if not new_raw.endswith(b"\n"):
+            new_raw += b"\n"
+    elif new_raw.endswith(b"\n"):
+        new_raw = new_raw[:-1]
+    return new_raw, count
+
+
+def process_file(p, kind):
+    """Strip one file in place; return True if it was rewritten."""
+    pattern, marker = kind
+    try:
+        raw = p.read_bytes()
+    except Exception:
+        print(f"Skipping binary/unreadable: {p}")
+        return False
+    if marker not in raw:
+        return False
+
+    new_raw, count = strip_comments(raw, pattern)
+    if count:
+        p.write_bytes(new_raw)
+    return bool(count)
+
+
+files = []
+for dirpath, dirnames, filenames in os.walk(ROOT):
+    dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+    for name in filenames:
+        kind = comment_pattern(name)
+        if kind is not None:
+            files.append((pathlib.Path(dirpath, name), kind))
+
+paths = [p for p, _ in files]
+kinds = [kind for _, kind in files]
+# Pool startup outweighs the work on small trees.
+if len(files) < PARALLEL_MIN_FILES:
+    changed = list(map(process_file, paths, kinds))
+else:
+    with ThreadPoolExecutor() as pool:
+        changed = list(pool.map(process_file, paths, kinds))
+
+modified = [str(p.relative_to(ROOT)) for p, hit in zip(paths, changed) if hit]
 
 print("Modified files (comments stripped):")
 for m in modified: